@@ -7,15 +7,160 @@
 """
 
 import os
+import copy
+import json
 import yaml
+import hashlib
 import logging
+import tempfile
 from datetime import datetime
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+# 优先使用基于LibYAML的C实现，不可用时回退到纯Python实现
+try:
+    from yaml import CSafeLoader as _YLoader, CSafeDumper as _YDumper
+except ImportError:
+    from yaml import SafeLoader as _YLoader, SafeDumper as _YDumper
+
+# 默认配置文件内容(时间戳之后的部分)，与ConfigManager._DEFAULTS保持一致
+_DEFAULT_CFG_BODY = """
+# 邮件相关配置
+email:
+  smtp_server: ''                # SMTP服务器地址
+  smtp_port: 587                 # 常用端口：587(TLS)或465(SSL)
+  use_ssl: false                 # 是否使用SSL连接
+  username: ''                   # 登录用户名
+  password: ''                   # 邮箱密码或应用专用密码
+  sender_email: ''               # 发件人邮箱，通常与username相同
+  recipients: []                 # 收件人列表
+  subject_prefix: '[ScreenMailer]'  # 所有邮件主题的前缀
+
+# 屏幕截图配置
+screenshot:
+  format: jpg                    # 图片格式
+  quality: 85                    # 图片质量(仅对jpg格式有效): 0-100
+  bbox: null                     # 截图区域[left, top, right, bottom]，null为全屏
+
+# 任务调度配置
+scheduler:
+  screenshot_interval: 300       # 截图间隔时间(秒)，默认5分钟
+  screenshot_count: 1            # 每次连续截取的截图数量
+  screenshot_delay: 0.5          # 连续截图之间的间隔时间(秒)
+  email_interval: 3600           # 邮件发送间隔时间(秒)，默认1小时
+  send_immediate: true           # 启动时是否立即执行一次任务
+"""
+
+def _atomic_write(path, text):
+    """
+    原子地写入文本文件：先一次性写入同目录下的临时文件，再替换目标文件
+    
+    Args:
+        path (str): 目标文件路径
+        text (str): 文件内容
+    """
+    data = text.encode('utf-8')
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-', suffix='.yaml')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _cache_path(path):
+    """
+    获取配置文件对应的JSON缓存文件路径
+    
+    缓存中包含邮箱密码在内的完整配置，放在用户缓存目录下而不是配置文件旁，避免随仓库提交；
+    缓存文件名由配置文件的绝对路径计算，不同配置文件的缓存互不影响
+    
+    Args:
+        path (str): 配置文件路径
+        
+    Returns:
+        str: JSON缓存文件路径
+    """
+    cache_root = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+    name = hashlib.blake2b(os.path.abspath(path).encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(cache_root, 'ScreenMailer', 'config-cache', f'{name}.json')
+
+@lru_cache(maxsize=8)
+def _load_yaml(path, mtime_ns, size):
+    """
+    解析YAML配置文件，结果按文件路径、修改时间和大小缓存
+    
+    进程内使用lru_cache缓存；跨进程时优先读取用户缓存目录下的JSON缓存，
+    只有JSON缓存缺失或与配置文件的修改时间、大小不一致时才解析YAML
+    
+    Args:
+        path (str): 配置文件路径
+        mtime_ns (int): 文件修改时间(纳秒)，用于使缓存失效
+        size (int): 文件大小，用于使缓存失效
+        
+    Returns:
+        dict: 解析得到的配置内容，调用方不应修改
+    """
+    cache_path = _cache_path(path)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached['mtime_ns'] == mtime_ns and cached['size'] == size:
+            return cached['config']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+        
+    with open(path, 'rb') as f:
+        config = yaml.load(f, Loader=_YLoader)
+        
+    # 写入JSON缓存，失败不影响配置加载；缓存含有密码，只允许当前用户读写
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        fd = os.open(cache_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'mtime_ns': mtime_ns, 'size': size, 'config': config}, f, ensure_ascii=False)
+    except (OSError, TypeError, ValueError) as e:
+        logger.debug(f"写入配置缓存失败: {str(e)}")
+        
+    return config
+
 class ConfigManager:
     """配置管理类"""
     
+    # 默认配置，各实例使用深拷贝，避免修改共享的默认值
+    _DEFAULTS = {
+        'email': {
+            'smtp_server': '',
+            'smtp_port': 587,
+            'use_ssl': False,
+            'username': '',
+            'password': '',
+            'sender_email': '',
+            'recipients': [],
+            'subject_prefix': '[ScreenMailer]'
+        },
+        'screenshot': {
+            'format': 'jpg',
+            'quality': 85,
+            'bbox': None
+        },
+        'scheduler': {
+            'screenshot_interval': 300,  # 5分钟
+            'screenshot_count': 1,
+            'screenshot_delay': 0.5,
+            'email_interval': 3600,      # 1小时
+            'send_immediate': True
+        }
+    }
+    
+    # 需要检查的(配置部分, 配置项)列表
+    _DEFAULT_KEYS = [(section, key) for section, values in _DEFAULTS.items() for key in values]
+    
     def __init__(self, config_path):
         """
         初始化配置管理器
@@ -25,30 +170,9 @@ class ConfigManager:
         """
         self.config_path = config_path
         self.config = None
-        self.default_config = {
-            'email': {
-                'smtp_server': '',
-                'smtp_port': 587,
-                'use_ssl': False,
-                'username': '',
-                'password': '',
-                'sender_email': '',
-                'recipients': [],
-                'subject_prefix': '[ScreenMailer]'
-            },
-            'screenshot': {
-                'format': 'png',
-                'quality': 90,
-                'bbox': None
-            },
-            'scheduler': {
-                'screenshot_interval': 300,  # 5分钟
-                'screenshot_count': 1,
-                'screenshot_delay': 0.5,
-                'email_interval': 3600,      # 1小时
-                'send_immediate': True
-            }
-        }
+        self._validated = False
+        # 默认配置只读共享，用到其中的部分时再深拷贝
+        self.default_config = self._DEFAULTS
         
         # 加载配置文件
         self.load_config()
@@ -63,12 +187,13 @@ class ConfigManager:
         try:
             # 如果配置文件存在，则从文件加载
             if os.path.exists(self.config_path):
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    self.config = yaml.safe_load(f)
+                # 文件未变化时直接使用缓存的解析结果，复制一份避免修改缓存
+                stat = os.stat(self.config_path)
+                self.config = copy.deepcopy(_load_yaml(self.config_path, stat.st_mtime_ns, stat.st_size))
                 logger.info(f"已从{self.config_path}加载配置")
             else:
                 # 如果配置文件不存在，则使用默认配置并创建配置文件
-                self.config = self.default_config
+                self.config = copy.deepcopy(self.default_config)
                 self._create_default_config()
                 logger.warning(f"配置文件{self.config_path}不存在，已创建默认配置")
                 
@@ -80,7 +205,7 @@ class ConfigManager:
         except Exception as e:
             logger.error(f"加载配置文件失败: {str(e)}")
             # 出错时使用默认配置
-            self.config = self.default_config
+            self.config = copy.deepcopy(self.default_config)
             return self.config
             
     def _create_default_config(self):
@@ -89,9 +214,8 @@ class ConfigManager:
             # 确保目录存在
             os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
             
-            # 写入默认配置
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(self.default_config, f, default_flow_style=False, sort_keys=False)
+            # 写入默认配置，只有文件头的生成时间需要格式化
+            _atomic_write(self.config_path, f"# ScreenMailer 配置文件\n# 由系统自动生成于 {datetime.now():%Y-%m-%d %H:%M:%S}\n" + _DEFAULT_CFG_BODY)
                 
             logger.info(f"已创建默认配置文件: {self.config_path}")
             
@@ -100,33 +224,22 @@ class ConfigManager:
             
     def _validate_config(self):
         """验证配置完整性，如果缺少项目则使用默认值补充"""
+        self._validated = True
         if not self.config:
-            self.config = self.default_config
+            self.config = copy.deepcopy(self.default_config)
             return
             
         # 确保顶层配置键存在
         for key in self.default_config:
             if key not in self.config:
-                self.config[key] = self.default_config[key]
+                self.config[key] = copy.deepcopy(self.default_config[key])
                 logger.warning(f"配置缺少{key}部分，已使用默认值")
                 
-        # 确保email子配置完整
-        for key in self.default_config['email']:
-            if key not in self.config['email']:
-                self.config['email'][key] = self.default_config['email'][key]
-                logger.warning(f"email配置缺少{key}，已使用默认值")
-                
-        # 确保screenshot子配置完整
-        for key in self.default_config['screenshot']:
-            if key not in self.config['screenshot']:
-                self.config['screenshot'][key] = self.default_config['screenshot'][key]
-                logger.warning(f"screenshot配置缺少{key}，已使用默认值")
-                
-        # 确保scheduler子配置完整
-        for key in self.default_config['scheduler']:
-            if key not in self.config['scheduler']:
-                self.config['scheduler'][key] = self.default_config['scheduler'][key]
-                logger.warning(f"scheduler配置缺少{key}，已使用默认值")
+        # 确保各部分的子配置完整
+        for section, key in self._DEFAULT_KEYS:
+            if key not in self.config[section]:
+                self.config[section][key] = copy.deepcopy(self.default_config[section][key])
+                logger.warning(f"{section}配置缺少{key}，已使用默认值")
     
     def get_config(self):
         """
@@ -139,29 +252,44 @@ class ConfigManager:
             self.load_config()
         return self.config
         
-    def save_config(self, new_config=None):
+    def save_config(self, new_config=None, dirty_sections=None):
         """
         保存配置到文件
         
         Args:
             new_config (dict, optional): 新的配置内容，如不提供则保存当前配置
+            dirty_sections (set, optional): 有修改的配置部分，为空集合时跳过写入；不提供则总是写入
             
         Returns:
             bool: 保存成功返回True，失败返回False
         """
         try:
             # 如果提供了新配置，则更新当前配置
-            if new_config:
+            if new_config and new_config is not self.config:
                 self.config = new_config
-                # 验证配置完整性
+                self._validated = False
+                
+            # 验证配置完整性，已验证过的当前配置无需重复验证
+            if not self._validated:
                 self._validate_config()
                 
+            # 没有修改的部分时无需写入文件
+            if dirty_sections is not None and not dirty_sections:
+                logger.info("配置未修改，跳过保存")
+                return True
+                
             # 确保目录存在
             os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
             
-            # 写入配置文件
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(self.config, f, default_flow_style=False, sort_keys=False)
+            # 先在内存中生成完整内容，再原子地写入配置文件，避免写入中断导致配置文件损坏
+            _atomic_write(self.config_path, yaml.dump(self.config, default_flow_style=False, sort_keys=False, allow_unicode=True, Dumper=_YDumper))
+                
+            # 清除过期的解析缓存，下次加载时重新生成
+            _load_yaml.cache_clear()
+            try:
+                os.remove(_cache_path(self.config_path))
+            except FileNotFoundError:
+                pass
                 
             logger.info(f"配置已保存到: {self.config_path}")
             return True
@@ -8,16 +8,18 @@ ScreenMailer GUI应用程序
 
 import os
 import sys
-import yaml
 import time
 import logging
+import threading
 from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QLabel, QPushButton, QTabWidget, QLineEdit, QGroupBox, 
-                            QFormLayout, QSpinBox, QComboBox, QTextEdit, QFileDialog,
-                            QCheckBox, QMessageBox, QListWidget, QTimeEdit, QDialog, QInputDialog)
-from PyQt5.QtCore import Qt, QTimer, QTime, pyqtSlot
-from PyQt5.QtGui import QIcon, QPixmap, QTextCursor
+                            QFormLayout, QSpinBox, QComboBox, QPlainTextEdit, QFileDialog,
+                            QCheckBox, QMessageBox, QListView, QTimeEdit, QDialog, QInputDialog)
+from PyQt5.QtCore import Qt, QObject, QRunnable, QSignalBlocker, QStringListModel, QThreadPool, QTimer, QTime, QUrl, pyqtSlot, pyqtSignal
+from PyQt5.QtGui import QIcon, QPixmap, QDesktopServices
 
 # 添加项目根目录到路径，以便导入ScreenMailer模块
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -27,22 +29,144 @@ project_root = os.path.dirname(src_dir)
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-# 导入ScreenMailer的核心模块
-from src.screenshot.capture import ScreenCapture
-from src.email.sender import EmailSender
-from src.scheduler.scheduler import Scheduler
+# 导入ScreenMailer的核心模块，截图、邮件和调度模块在首次使用时导入以加快启动
 from src.config.config_manager import ConfigManager
-from src.utils.logger import setup_logger, get_logger
+from src.utils.logger import setup_logger, get_logger, get_active_log_file
+from src.utils.dpi import enable_dpi_awareness
 
 # 设置日志
 logger = get_logger(__name__)
 
+# 首次加载日志时最多读取的字节数
+LOG_TAIL_BYTES = 256 * 1024
+
+# 日志选项卡最多显示的行数
+LOG_MAX_LINES = 10000
+
+# 邮件发送模式，顺序与发送模式下拉框的选项一致
+EMAIL_MODES = ('interval', 'hourly', 'half_hourly', 'custom')
+EMAIL_MODE_INDEX = {mode: index for index, mode in enumerate(EMAIL_MODES)}
+
+# 截图格式，顺序与图片格式下拉框的选项一致
+IMAGE_FORMATS = ('png', 'jpg', 'bmp')
+IMAGE_FORMAT_INDEX = {fmt: index for index, fmt in enumerate(IMAGE_FORMATS)}
+
+# 选项卡索引
+TAB_DASHBOARD, TAB_EMAIL, TAB_SCREENSHOT, TAB_SCHEDULER, TAB_LOGS = range(5)
+
+@lru_cache(maxsize=None)
+def get_app_data_dir(app_name="ScreenMailer"):
+    """
+    获取应用程序数据目录，位于用户的"文档"文件夹下，结果在进程内缓存
+    
+    Args:
+        app_name (str): 应用程序名称
+        
+    Returns:
+        Path: 应用程序数据目录
+    """
+    if sys.platform == "win32":
+        # 通过系统接口获取"文档"文件夹，兼容被重定向的文档目录
+        import ctypes.wintypes
+        CSIDL_PERSONAL = 5  # "我的文档"文件夹的ID
+        buf = ctypes.create_unicode_buffer(ctypes.wintypes.MAX_PATH)
+        if ctypes.windll.shell32.SHGetFolderPathW(0, CSIDL_PERSONAL, 0, 0, buf) == 0 and buf.value:
+            return Path(buf.value) / app_name
+        return Path(os.environ.get('USERPROFILE', Path.home())) / "Documents" / app_name
+        
+    # 在非Windows系统上使用用户的主目录下的Documents文件夹
+    return Path.home() / "Documents" / app_name
+
+def make_spinbox(minimum, maximum, value=None, suffix=''):
+    """
+    创建数字输入框，设置属性期间屏蔽信号
+    
+    Args:
+        minimum (int): 最小值
+        maximum (int): 最大值
+        value (int, optional): 初始值，默认为最小值
+        suffix (str): 显示的单位后缀
+        
+    Returns:
+        QSpinBox: 数字输入框
+    """
+    spinbox = QSpinBox()
+    spinbox.blockSignals(True)
+    spinbox.setRange(minimum, maximum)
+    if suffix:
+        spinbox.setSuffix(suffix)
+    if value is not None:
+        spinbox.setValue(value)
+    spinbox.blockSignals(False)
+    return spinbox
+
 def resource_path(relative_path):
     # 兼容打包和源码运行
     if hasattr(sys, '_MEIPASS'):
         return os.path.join(sys._MEIPASS, relative_path)
     return os.path.join(os.path.abspath("."), relative_path)
 
+class QtLogHandler(QObject, logging.Handler):
+    """将日志记录通过Qt信号转发到界面的日志处理器"""
+    
+    new_record = pyqtSignal(str)
+    
+    def __init__(self, level=logging.NOTSET):
+        QObject.__init__(self)
+        logging.Handler.__init__(self, level)
+        
+    def emit(self, record):
+        """
+        格式化日志记录并通过信号发出
+        
+        Args:
+            record (logging.LogRecord): 日志记录
+        """
+        try:
+            self.new_record.emit(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+class WorkerSignals(QObject):
+    """后台任务的结果信号"""
+    
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+class Worker(QRunnable):
+    """在QThreadPool中执行耗时操作的后台任务，通过信号返回结果"""
+    
+    def __init__(self, fn, *args, **kwargs):
+        """
+        初始化后台任务
+        
+        Args:
+            fn (callable): 要在后台线程中执行的函数
+            *args: 传给fn的位置参数
+            **kwargs: 传给fn的关键字参数
+        """
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        
+    def run(self):
+        """执行任务并发出结果信号"""
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+class SchedulerBridge(QObject):
+    """调度器到界面的信号桥，调度器线程中发出的信号由Qt排队投递到界面线程"""
+    
+    screenshot_captured = pyqtSignal(str, float)
+    email_sent = pyqtSignal(int, float)
+    error = pyqtSignal(str)
+
 class ScreenMailerGUI(QMainWindow):
     """ScreenMailer图形界面主窗口"""
     
@@ -51,14 +175,29 @@ class ScreenMailerGUI(QMainWindow):
         
         # 应用程序状态
         self.scheduler = None
+        self.scheduler_config_snapshot = None
+        self.startup_worker = None
+        self.preview_worker = None
+        self.send_worker = None
+        self.test_email_worker = None
+        self.recipient_dialog = None
+        self.custom_time_dialog = None
+        self.custom_time_edit = None
+        self.screen_capture = None
+        self.screen_capture_config = None
+        self.screen_capture_lock = threading.Lock()
         self.is_running = False
         self.config_manager = None
         self.config = None
+        self.dirty_sections = set()
+        self.ui_dirty = False
         self.last_screenshot_time = None
         self.last_email_time = None
         self.unsent_screenshot_count = 0
         self.total_screenshots = 0
         self.total_emails = 0
+        self.start_time = None
+        self.run_time_text = None
         
         # 设置应用程序数据目录
         self.setup_app_directories()
@@ -75,33 +214,28 @@ class ScreenMailerGUI(QMainWindow):
         self.logger.info("ScreenMailer GUI已启动")
         
     def setup_app_directories(self):
-        """设置应用程序的数据目录"""
-        # 使用用户的"文档"文件夹存储应用程序数据
-        app_name = "ScreenMailer"
-        if sys.platform == "win32":
-            # 获取Windows系统中的"文档"文件夹路径
-            import ctypes.wintypes
-            CSIDL_PERSONAL = 5  # "我的文档"文件夹的ID
-            buf = ctypes.create_unicode_buffer(ctypes.wintypes.MAX_PATH)
-            ctypes.windll.shell32.SHGetFolderPathW(0, CSIDL_PERSONAL, 0, 0, buf)
-            documents_path = buf.value
-            self.app_data_dir = os.path.join(documents_path, app_name)
-        else:
-            # 在非Windows系统上使用用户的主目录下的Documents文件夹
-            self.app_data_dir = os.path.join(os.path.expanduser("~"), "Documents", app_name)
-            
-        # 创建必要的子目录
-        self.log_dir = os.path.join(self.app_data_dir, "logs")
-        self.config_dir = os.path.join(self.app_data_dir, "config")
-        self.screenshot_dir = os.path.join(self.app_data_dir, "screenshots")
+        """设置应用程序的数据目录，并完成截图前一次性的进程设置"""
+        # 截图前设置DPI感知，获取物理分辨率的画面
+        enable_dpi_awareness()
         
-        # 确保目录存在
-        os.makedirs(self.log_dir, exist_ok=True)
-        os.makedirs(self.config_dir, exist_ok=True)
-        os.makedirs(self.screenshot_dir, exist_ok=True)
+        # 使用用户的"文档"文件夹存储应用程序数据
+        app_data_dir = get_app_data_dir()
+        log_dir = app_data_dir / "logs"
+        config_dir = app_data_dir / "config"
+        screenshot_dir = app_data_dir / "screenshots"
+        
+        # 确保目录存在，已存在时跳过创建
+        for path in (log_dir, config_dir, screenshot_dir):
+            if not path.is_dir():
+                path.mkdir(parents=True, exist_ok=True)
+                
+        self.app_data_dir = os.fspath(app_data_dir)
+        self.log_dir = os.fspath(log_dir)
+        self.config_dir = os.fspath(config_dir)
+        self.screenshot_dir = os.fspath(screenshot_dir)
         
         # 设置配置文件路径
-        self.config_file = os.path.join(self.config_dir, "config.yaml")
+        self.config_file = os.fspath(config_dir / "config.yaml")
         
         logger.info(f"应用程序数据目录: {self.app_data_dir}")
         
@@ -111,20 +245,36 @@ class ScreenMailerGUI(QMainWindow):
             # 初始化配置管理器
             self.config_manager = ConfigManager(self.config_file)
             self.config = self.config_manager.get_config()
+            self.dirty_sections.clear()
+            self.ui_dirty = False
             logger.info("已加载配置文件")
         except Exception as e:
             logger.error(f"加载配置文件失败: {str(e)}")
             self.config = {}
             
+    def reload_config(self):
+        """重新加载配置文件并刷新界面，只重新填充控件，不重建选项卡"""
+        self.load_config()
+        
+        # 未创建的选项卡会在创建时从新配置填充
+        if self.tab_built[TAB_EMAIL]:
+            self.init_email_config()
+        if self.tab_built[TAB_SCREENSHOT]:
+            self.init_screenshot_config()
+        if self.tab_built[TAB_SCHEDULER]:
+            self.init_scheduler_config()
+        logger.info("配置已重新加载")
+        
     def save_config(self):
         """保存配置到文件"""
         if self.config_manager:
             # 从UI更新配置
             self.update_config_from_ui()
             
-            # 保存配置
-            result = self.config_manager.save_config(self.config)
+            # 保存配置，只有修改过的部分才需要写入
+            result = self.config_manager.save_config(self.config, dirty_sections=self.dirty_sections)
             if result:
+                self.dirty_sections.clear()
                 logger.info("配置已保存")
                 QMessageBox.information(self, "配置保存", "配置已成功保存")
             else:
@@ -151,12 +301,25 @@ class ScreenMailerGUI(QMainWindow):
         self.tabs = QTabWidget()
         main_layout.addWidget(self.tabs)
         
-        # 添加选项卡
-        self.create_dashboard_tab()
-        self.create_email_config_tab()
-        self.create_screenshot_config_tab()
-        self.create_scheduler_config_tab()
-        self.create_logs_tab()
+        # 配置控件变化后延迟同步到配置，连续的修改只触发一次更新
+        self.config_update_timer = QTimer(self)
+        self.config_update_timer.setSingleShot(True)
+        self.config_update_timer.setInterval(150)
+        self.config_update_timer.timeout.connect(self.update_config_from_ui)
+        
+        # 添加选项卡，除仪表盘外先放置占位控件，首次切换到选项卡时再创建内容
+        self.tab_builders = [
+            ("仪表盘", self.create_dashboard_tab),
+            ("邮件设置", self.create_email_config_tab),
+            ("截图设置", self.create_screenshot_config_tab),
+            ("调度设置", self.create_scheduler_config_tab),
+            ("日志", self.create_logs_tab)
+        ]
+        self.tab_built = [False] * len(self.tab_builders)
+        for title, _ in self.tab_builders:
+            self.tabs.addTab(QWidget(), title)
+        self.build_tab(TAB_DASHBOARD)
+        self.tabs.currentChanged.connect(self.build_tab)
         
         # 底部按钮布局
         bottom_layout = QHBoxLayout()
@@ -167,6 +330,11 @@ class ScreenMailerGUI(QMainWindow):
         self.save_button.clicked.connect(self.save_config)
         bottom_layout.addWidget(self.save_button)
         
+        # 重新加载配置按钮
+        self.reload_button = QPushButton("重新加载配置")
+        self.reload_button.clicked.connect(self.reload_config)
+        bottom_layout.addWidget(self.reload_button)
+        
         # 开始/停止按钮
         self.start_stop_button = QPushButton("启动监控")
         self.start_stop_button.clicked.connect(self.toggle_monitoring)
@@ -177,16 +345,83 @@ class ScreenMailerGUI(QMainWindow):
         self.capture_send_button.clicked.connect(self.capture_and_send)
         bottom_layout.addWidget(self.capture_send_button)
         
-        # 状态更新定时器
-        self.status_timer = QTimer()
+        # 截图/邮件状态由调度器信号驱动更新
+        self.scheduler_bridge = SchedulerBridge(self)
+        self.scheduler_bridge.screenshot_captured.connect(self.on_screenshot_captured, Qt.QueuedConnection)
+        self.scheduler_bridge.email_sent.connect(self.on_email_sent, Qt.QueuedConnection)
+        self.scheduler_bridge.error.connect(self.on_scheduler_error, Qt.QueuedConnection)
+        
+        # 运行时间更新定时器，仅用于刷新运行时间，只在监控运行期间启动
+        self.status_timer = QTimer(self)
+        self.status_timer.setInterval(10000)  # 每10秒更新一次
         self.status_timer.timeout.connect(self.update_status)
-        self.status_timer.start(1000)  # 每秒更新一次
         
         # 设置窗口图标
         self.setWindowIcon(QIcon("icon.png"))  # 您需要添加一个图标文件
         
+    def build_tab(self, index):
+        """
+        创建选项卡内容并替换占位控件，每个选项卡只创建一次
+        
+        Args:
+            index (int): 选项卡索引
+        """
+        if index < 0 or self.tab_built[index]:
+            return
+        self.tab_built[index] = True
+        
+        title, builder = self.tab_builders[index]
+        tab = builder()
+        placeholder = self.tabs.widget(index)
+        
+        # 替换期间屏蔽信号，避免移除选项卡时触发currentChanged
+        self.tabs.blockSignals(True)
+        self.tabs.removeTab(index)
+        self.tabs.insertTab(index, tab, title)
+        self.tabs.setCurrentIndex(index)
+        self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+        
+    def connect_config_change_signals(self, line_edits=(), spinboxes=(), checkboxes=(), combos=(), models=()):
+        """
+        将配置控件的变化信号连接到延迟更新
+        
+        Args:
+            line_edits (tuple): 文本输入框
+            spinboxes (tuple): 数字输入框
+            checkboxes (tuple): 复选框
+            combos (tuple): 下拉框
+            models (tuple): 列表数据模型
+        """
+        for line_edit in line_edits:
+            line_edit.textChanged.connect(self.schedule_config_update)
+            
+        for spinbox in spinboxes:
+            spinbox.valueChanged.connect(self.schedule_config_update)
+            
+        for checkbox in checkboxes:
+            checkbox.stateChanged.connect(self.schedule_config_update)
+            
+        for combo in combos:
+            combo.currentIndexChanged.connect(self.schedule_config_update)
+            
+        for model in models:
+            model.rowsInserted.connect(self.schedule_config_update)
+            model.rowsRemoved.connect(self.schedule_config_update)
+            model.modelReset.connect(self.schedule_config_update)
+            
+    def schedule_config_update(self, *args):
+        """标记界面有未同步的修改，并重新开始延迟计时，计时结束后从UI更新配置"""
+        self.ui_dirty = True
+        self.config_update_timer.start()
+        
     def create_dashboard_tab(self):
-        """创建仪表盘选项卡"""
+        """
+        创建仪表盘选项卡
+        
+        Returns:
+            QWidget: 选项卡内容
+        """
         dashboard_tab = QWidget()
         layout = QVBoxLayout(dashboard_tab)
         
@@ -227,11 +462,15 @@ class ScreenMailerGUI(QMainWindow):
         self.run_time_label = QLabel("00:00:00")
         stats_layout.addRow("运行时间:", self.run_time_label)
         
-        # 添加仪表盘选项卡
-        self.tabs.addTab(dashboard_tab, "仪表盘")
+        return dashboard_tab
         
     def create_email_config_tab(self):
-        """创建邮件配置选项卡"""
+        """
+        创建邮件配置选项卡
+        
+        Returns:
+            QWidget: 选项卡内容
+        """
         email_tab = QWidget()
         layout = QVBoxLayout(email_tab)
         
@@ -246,9 +485,7 @@ class ScreenMailerGUI(QMainWindow):
         smtp_layout.addRow("SMTP服务器:", self.smtp_server_input)
         
         # 端口号
-        self.smtp_port_input = QSpinBox()
-        self.smtp_port_input.setRange(1, 65535)
-        self.smtp_port_input.setValue(587)
+        self.smtp_port_input = make_spinbox(1, 65535, 587)
         smtp_layout.addRow("端口号:", self.smtp_port_input)
         
         # 使用SSL
@@ -281,7 +518,10 @@ class ScreenMailerGUI(QMainWindow):
         layout.addWidget(recipients_group)
         
         # 收件人列表
-        self.recipients_list = QListWidget()
+        self.recipients_model = QStringListModel()
+        self.recipients_list = QListView()
+        self.recipients_list.setModel(self.recipients_model)
+        self.recipients_list.setEditTriggers(QListView.NoEditTriggers)
         recipients_layout.addWidget(self.recipients_list)
         
         # 收件人管理按钮
@@ -307,11 +547,17 @@ class ScreenMailerGUI(QMainWindow):
         self.test_email_btn.clicked.connect(self.send_test_email)
         layout.addWidget(self.test_email_btn)
         
-        # 添加邮件配置选项卡
-        self.tabs.addTab(email_tab, "邮件设置")
-        
         # 初始化邮件配置
         self.init_email_config()
+        self.connect_config_change_signals(
+            line_edits=(self.smtp_server_input, self.username_input, self.password_input,
+                        self.sender_email_input, self.subject_prefix_input),
+            spinboxes=(self.smtp_port_input,),
+            checkboxes=(self.use_ssl_checkbox,),
+            models=(self.recipients_model,)
+        )
+        
+        return email_tab
         
     def init_email_config(self):
         """从配置中初始化邮件设置"""
@@ -320,6 +566,13 @@ class ScreenMailerGUI(QMainWindow):
             
         email_config = self.config.get('email', {})
         
+        # 填充控件期间屏蔽信号，避免逐个触发变化处理
+        blockers = [QSignalBlocker(w) for w in (
+            self.smtp_server_input, self.smtp_port_input, self.use_ssl_checkbox,
+            self.username_input, self.password_input, self.sender_email_input,
+            self.recipients_model, self.subject_prefix_input
+        )]
+        
         # 设置SMTP信息
         self.smtp_server_input.setText(email_config.get('smtp_server', ''))
         self.smtp_port_input.setValue(email_config.get('smtp_port', 587))
@@ -331,31 +584,42 @@ class ScreenMailerGUI(QMainWindow):
         self.sender_email_input.setText(email_config.get('sender_email', ''))
         
         # 设置收件人
-        self.recipients_list.clear()
-        recipients = email_config.get('recipients', [])
-        for recipient in recipients:
-            self.recipients_list.addItem(recipient)
+        self.recipients_model.setStringList(email_config.get('recipients', []))
             
         # 设置主题前缀
         self.subject_prefix_input.setText(email_config.get('subject_prefix', '[ScreenMailer]'))
         
     def add_recipient(self):
-        """添加收件人"""
-        email, ok = QInputDialog.getText(self, "添加收件人", "请输入收件人邮箱:")
-        if ok and email:
-            self.recipients_list.addItem(email)
+        """添加收件人，对话框首次使用时创建并在之后复用"""
+        if self.recipient_dialog is None:
+            self.recipient_dialog = QInputDialog(self)
+            self.recipient_dialog.setInputMode(QInputDialog.TextInput)
+            self.recipient_dialog.setWindowTitle("添加收件人")
+            self.recipient_dialog.setLabelText("请输入收件人邮箱:")
+            
+        self.recipient_dialog.setTextValue("")
+        if self.recipient_dialog.exec_():
+            email = self.recipient_dialog.textValue()
+            if not email:
+                return
+            recipients = self.recipients_model.stringList()
+            recipients.append(email)
+            self.recipients_model.setStringList(recipients)
             
     def remove_recipient(self):
         """移除收件人"""
-        selected_items = self.recipients_list.selectedItems()
-        if not selected_items:
-            return
-            
-        for item in selected_items:
-            self.recipients_list.takeItem(self.recipients_list.row(item))
+        # 从后往前删除，避免行号变化
+        rows = sorted({index.row() for index in self.recipients_list.selectedIndexes()}, reverse=True)
+        for row in rows:
+            self.recipients_model.removeRows(row, 1)
             
     def create_screenshot_config_tab(self):
-        """创建截图配置选项卡"""
+        """
+        创建截图配置选项卡
+        
+        Returns:
+            QWidget: 选项卡内容
+        """
         screenshot_tab = QWidget()
         layout = QVBoxLayout(screenshot_tab)
         
@@ -367,13 +631,11 @@ class ScreenMailerGUI(QMainWindow):
         
         # 图片格式
         self.format_combo = QComboBox()
-        self.format_combo.addItems(["png", "jpg", "bmp"])
+        self.format_combo.addItems(list(IMAGE_FORMATS))
         screenshot_layout.addRow("图片格式:", self.format_combo)
         
         # 图片质量
-        self.quality_spinbox = QSpinBox()
-        self.quality_spinbox.setRange(1, 100)
-        self.quality_spinbox.setValue(90)
+        self.quality_spinbox = make_spinbox(1, 100, 85)
         screenshot_layout.addRow("图片质量(1-100):", self.quality_spinbox)
         
         # 截图区域设置
@@ -391,23 +653,19 @@ class ScreenMailerGUI(QMainWindow):
         # 自定义区域
         region_inputs_layout = QHBoxLayout()
         
-        self.left_input = QSpinBox()
-        self.left_input.setRange(0, 9999)
+        self.left_input = make_spinbox(0, 9999)
         region_inputs_layout.addWidget(QLabel("左:"))
         region_inputs_layout.addWidget(self.left_input)
         
-        self.top_input = QSpinBox()
-        self.top_input.setRange(0, 9999)
+        self.top_input = make_spinbox(0, 9999)
         region_inputs_layout.addWidget(QLabel("上:"))
         region_inputs_layout.addWidget(self.top_input)
         
-        self.right_input = QSpinBox()
-        self.right_input.setRange(0, 9999)
+        self.right_input = make_spinbox(0, 9999)
         region_inputs_layout.addWidget(QLabel("右:"))
         region_inputs_layout.addWidget(self.right_input)
         
-        self.bottom_input = QSpinBox()
-        self.bottom_input.setRange(0, 9999)
+        self.bottom_input = make_spinbox(0, 9999)
         region_inputs_layout.addWidget(QLabel("下:"))
         region_inputs_layout.addWidget(self.bottom_input)
         
@@ -423,11 +681,16 @@ class ScreenMailerGUI(QMainWindow):
         self.test_screenshot_btn.clicked.connect(self.test_screenshot)
         layout.addWidget(self.test_screenshot_btn)
         
-        # 添加截图配置选项卡
-        self.tabs.addTab(screenshot_tab, "截图设置")
-        
         # 初始化截图配置
         self.init_screenshot_config()
+        self.connect_config_change_signals(
+            spinboxes=(self.quality_spinbox, self.left_input, self.top_input,
+                       self.right_input, self.bottom_input),
+            checkboxes=(self.fullscreen_checkbox,),
+            combos=(self.format_combo,)
+        )
+        
+        return screenshot_tab
         
     def init_screenshot_config(self):
         """从配置中初始化截图设置"""
@@ -436,14 +699,17 @@ class ScreenMailerGUI(QMainWindow):
             
         screenshot_config = self.config.get('screenshot', {})
         
+        # 填充控件期间屏蔽信号，区域输入框的启用状态在下方直接设置
+        blockers = [QSignalBlocker(w) for w in (
+            self.format_combo, self.quality_spinbox, self.fullscreen_checkbox,
+            self.left_input, self.top_input, self.right_input, self.bottom_input
+        )]
+        
         # 设置图片格式
-        format_value = screenshot_config.get('format', 'png')
-        index = self.format_combo.findText(format_value)
-        if index >= 0:
-            self.format_combo.setCurrentIndex(index)
+        self.format_combo.setCurrentIndex(IMAGE_FORMAT_INDEX.get(screenshot_config.get('format', 'jpg'), 0))
             
         # 设置图片质量
-        self.quality_spinbox.setValue(screenshot_config.get('quality', 90))
+        self.quality_spinbox.setValue(screenshot_config.get('quality', 85))
         
         # 设置截图区域
         bbox = screenshot_config.get('bbox', None)
@@ -474,12 +740,31 @@ class ScreenMailerGUI(QMainWindow):
         # 可以使用第三方库如PyQt5的QRubberBand
         QMessageBox.information(self, "选择区域", "区域选择功能待实现")
         
+    def get_screen_capture(self, screenshot_config):
+        """
+        获取截图对象，截图配置未变化时复用已有实例
+        
+        首次导入截图模块和创建截图对象较慢，只在后台线程中调用，多个后台任务共用同一个实例
+        
+        Args:
+            screenshot_config (dict): 截图配置
+            
+        Returns:
+            ScreenCapture: 截图对象
+        """
+        with self.screen_capture_lock:
+            if self.screen_capture is None or screenshot_config != self.screen_capture_config:
+                from src.screenshot.capture import ScreenCapture
+                self.screen_capture = ScreenCapture(self.screenshot_dir, screenshot_config)
+                self.screen_capture_config = dict(screenshot_config)
+            return self.screen_capture
+        
     def test_screenshot(self):
-        """测试截图功能"""
+        """测试截图功能，截图和保存在后台线程中执行"""
         try:
             # 获取截图配置
             screenshot_config = {
-                'format': self.format_combo.currentText(),
+                'format': IMAGE_FORMATS[self.format_combo.currentIndex()],
                 'quality': self.quality_spinbox.value(),
                 'bbox': None if self.fullscreen_checkbox.isChecked() else [
                     self.left_input.value(),
@@ -489,23 +774,56 @@ class ScreenMailerGUI(QMainWindow):
                 ]
             }
             
-            # 创建临时截图对象
-            screen_capture = ScreenCapture(self.screenshot_dir, screenshot_config)
-            
-            # 进行截图
-            screenshot_path = screen_capture.capture()
-            
-            if screenshot_path:
-                QMessageBox.information(self, "测试成功", f"截图已保存至: {screenshot_path}")
-            else:
-                QMessageBox.warning(self, "测试失败", "截图失败，请检查设置和日志")
-                
         except Exception as e:
             logger.error(f"测试截图失败: {str(e)}")
             QMessageBox.critical(self, "错误", f"测试截图时发生错误: {str(e)}")
+            return
+            
+        # 截图完成前禁用按钮，避免重复点击
+        self.test_screenshot_btn.setEnabled(False)
+        
+        self.preview_worker = Worker(lambda: self.get_screen_capture(screenshot_config).capture())
+        self.preview_worker.signals.finished.connect(self.on_test_screenshot_finished)
+        self.preview_worker.signals.failed.connect(self.on_test_screenshot_failed)
+        QThreadPool.globalInstance().start(self.preview_worker)
+        
+    @pyqtSlot(object)
+    def on_test_screenshot_finished(self, screenshot_path):
+        """
+        测试截图完成
+        
+        Args:
+            screenshot_path (str): 截图保存路径，失败时为None
+        """
+        self.preview_worker = None
+        self.test_screenshot_btn.setEnabled(True)
+        
+        if screenshot_path:
+            QMessageBox.information(self, "测试成功", f"截图已保存至: {screenshot_path}")
+        else:
+            QMessageBox.warning(self, "测试失败", "截图失败，请检查设置和日志")
+            
+    @pyqtSlot(str)
+    def on_test_screenshot_failed(self, error):
+        """
+        测试截图出错
+        
+        Args:
+            error (str): 错误信息
+        """
+        self.preview_worker = None
+        self.test_screenshot_btn.setEnabled(True)
+        
+        logger.error(f"测试截图失败: {error}")
+        QMessageBox.critical(self, "错误", f"测试截图时发生错误: {error}")
             
     def create_scheduler_config_tab(self):
-        """创建调度器配置选项卡"""
+        """
+        创建调度器配置选项卡
+        
+        Returns:
+            QWidget: 选项卡内容
+        """
         scheduler_tab = QWidget()
         layout = QVBoxLayout(scheduler_tab)
         
@@ -516,25 +834,16 @@ class ScreenMailerGUI(QMainWindow):
         layout.addWidget(screenshot_schedule_group)
         
         # 截图间隔
-        self.screenshot_interval_spinbox = QSpinBox()
-        self.screenshot_interval_spinbox.setRange(5, 86400)  # 5秒到24小时
-        self.screenshot_interval_spinbox.setValue(300)  # 默认5分钟
-        self.screenshot_interval_spinbox.setSuffix(" 秒")
+        self.screenshot_interval_spinbox = make_spinbox(5, 86400, 300, " 秒")  # 5秒到24小时，默认5分钟
         self.screenshot_interval_spinbox.setToolTip("两次自动截图任务之间的时间间隔（单位：秒）")
         screenshot_schedule_layout.addRow("截图间隔:", self.screenshot_interval_spinbox)
         
         # 连续截图数量
-        self.screenshot_count_spinbox = QSpinBox()
-        self.screenshot_count_spinbox.setRange(1, 10)
-        self.screenshot_count_spinbox.setValue(1)
-        self.screenshot_count_spinbox.setSuffix(" 张")
+        self.screenshot_count_spinbox = make_spinbox(1, 10, 1, " 张")
         screenshot_schedule_layout.addRow("连续截图数量:", self.screenshot_count_spinbox)
         
         # 连续截图间隔
-        self.screenshot_delay_spinbox = QSpinBox()
-        self.screenshot_delay_spinbox.setRange(0, 60)
-        self.screenshot_delay_spinbox.setValue(1)
-        self.screenshot_delay_spinbox.setSuffix(" 秒")
+        self.screenshot_delay_spinbox = make_spinbox(0, 60, 1, " 秒")
         self.screenshot_delay_spinbox.setToolTip("每次连续截图时，每两张之间的间隔（单位：秒）")
         screenshot_schedule_layout.addRow("连续截图间隔:", self.screenshot_delay_spinbox)
         
@@ -551,14 +860,14 @@ class ScreenMailerGUI(QMainWindow):
         email_schedule_layout.addRow("发送模式:", self.email_mode_combo)
         
         # 邮件发送间隔
-        self.email_interval_spinbox = QSpinBox()
-        self.email_interval_spinbox.setRange(60, 86400)  # 1分钟到24小时
-        self.email_interval_spinbox.setValue(3600)  # 默认1小时
-        self.email_interval_spinbox.setSuffix(" 秒")
+        self.email_interval_spinbox = make_spinbox(60, 86400, 3600, " 秒")  # 1分钟到24小时，默认1小时
         email_schedule_layout.addRow("发送间隔:", self.email_interval_spinbox)
         
         # 自定义时间列表
-        self.custom_times_list = QListWidget()
+        self.custom_times_model = QStringListModel()
+        self.custom_times_list = QListView()
+        self.custom_times_list.setModel(self.custom_times_model)
+        self.custom_times_list.setEditTriggers(QListView.NoEditTriggers)
         email_schedule_layout.addRow("自定义时间:", self.custom_times_list)
         
         # 自定义时间管理按钮
@@ -582,11 +891,17 @@ class ScreenMailerGUI(QMainWindow):
         self.send_with_capture_checkbox = QCheckBox()
         email_schedule_layout.addRow("截图后立即发送:", self.send_with_capture_checkbox)
         
-        # 添加调度器配置选项卡
-        self.tabs.addTab(scheduler_tab, "调度设置")
-        
         # 初始化调度器配置
         self.init_scheduler_config()
+        self.connect_config_change_signals(
+            spinboxes=(self.screenshot_interval_spinbox, self.screenshot_count_spinbox,
+                       self.screenshot_delay_spinbox, self.email_interval_spinbox),
+            checkboxes=(self.send_immediate_checkbox, self.send_with_capture_checkbox),
+            combos=(self.email_mode_combo,),
+            models=(self.custom_times_model,)
+        )
+        
+        return scheduler_tab
         
     def init_scheduler_config(self):
         """从配置中初始化调度器设置"""
@@ -595,29 +910,25 @@ class ScreenMailerGUI(QMainWindow):
             
         scheduler_config = self.config.get('scheduler', {})
         
+        # 填充控件期间屏蔽信号，发送模式相关的界面状态在最后统一更新
+        blockers = [QSignalBlocker(w) for w in (
+            self.screenshot_interval_spinbox, self.screenshot_count_spinbox,
+            self.screenshot_delay_spinbox, self.email_mode_combo, self.email_interval_spinbox,
+            self.custom_times_model, self.send_immediate_checkbox, self.send_with_capture_checkbox
+        )]
+        
         # 设置截图调度 - 确保将浮点数转换为整数
         self.screenshot_interval_spinbox.setValue(int(scheduler_config.get('screenshot_interval', 300)))
         self.screenshot_count_spinbox.setValue(int(scheduler_config.get('screenshot_count', 1)))
         self.screenshot_delay_spinbox.setValue(int(scheduler_config.get('screenshot_delay', 1)))
         
         # 设置邮件调度
-        email_mode = scheduler_config.get('email_mode', 'interval')
-        if email_mode == 'interval':
-            self.email_mode_combo.setCurrentIndex(0)
-        elif email_mode == 'hourly':
-            self.email_mode_combo.setCurrentIndex(1)
-        elif email_mode == 'half_hourly':
-            self.email_mode_combo.setCurrentIndex(2)
-        elif email_mode == 'custom':
-            self.email_mode_combo.setCurrentIndex(3)
+        self.email_mode_combo.setCurrentIndex(EMAIL_MODE_INDEX.get(scheduler_config.get('email_mode', 'interval'), 0))
             
         self.email_interval_spinbox.setValue(int(scheduler_config.get('email_interval', 3600)))
         
         # 设置自定义时间
-        self.custom_times_list.clear()
-        custom_times = scheduler_config.get('email_custom_times', [])
-        for time_str in custom_times:
-            self.custom_times_list.addItem(time_str)
+        self.custom_times_model.setStringList(scheduler_config.get('email_custom_times', []))
             
         # 设置其他选项
         self.send_immediate_checkbox.setChecked(scheduler_config.get('send_immediate', True))
@@ -638,49 +949,57 @@ class ScreenMailerGUI(QMainWindow):
         self.remove_time_btn.setEnabled(custom_times_enabled)
         
     def add_custom_time(self):
-        """添加自定义时间"""
-        time_dialog = QTimeEdit()
-        time_dialog.setTime(QTime.currentTime())
-        time_dialog.setDisplayFormat("HH:mm")
-        
-        dialog = QDialog(self)
-        dialog.setWindowTitle("添加自定义时间")
-        
-        layout = QVBoxLayout(dialog)
-        layout.addWidget(QLabel("请选择时间:"))
-        layout.addWidget(time_dialog)
-        
-        buttons = QHBoxLayout()
-        ok_btn = QPushButton("确定")
-        ok_btn.clicked.connect(dialog.accept)
-        cancel_btn = QPushButton("取消")
-        cancel_btn.clicked.connect(dialog.reject)
-        
-        buttons.addWidget(ok_btn)
-        buttons.addWidget(cancel_btn)
-        layout.addLayout(buttons)
-        
-        if dialog.exec_():
-            time_str = time_dialog.time().toString("HH:mm")
-            self.custom_times_list.addItem(time_str)
+        """添加自定义时间，对话框首次使用时创建并在之后复用"""
+        if self.custom_time_dialog is None:
+            self.custom_time_edit = QTimeEdit()
+            self.custom_time_edit.setDisplayFormat("HH:mm")
+            
+            self.custom_time_dialog = QDialog(self)
+            self.custom_time_dialog.setWindowTitle("添加自定义时间")
+            
+            layout = QVBoxLayout(self.custom_time_dialog)
+            layout.addWidget(QLabel("请选择时间:"))
+            layout.addWidget(self.custom_time_edit)
+            
+            buttons = QHBoxLayout()
+            ok_btn = QPushButton("确定")
+            ok_btn.clicked.connect(self.custom_time_dialog.accept)
+            cancel_btn = QPushButton("取消")
+            cancel_btn.clicked.connect(self.custom_time_dialog.reject)
+            
+            buttons.addWidget(ok_btn)
+            buttons.addWidget(cancel_btn)
+            layout.addLayout(buttons)
+            
+        self.custom_time_edit.setTime(QTime.currentTime())
+        if self.custom_time_dialog.exec_():
+            time_str = self.custom_time_edit.time().toString("HH:mm")
+            custom_times = self.custom_times_model.stringList()
+            custom_times.append(time_str)
+            self.custom_times_model.setStringList(custom_times)
             
     def remove_custom_time(self):
         """移除自定义时间"""
-        selected_items = self.custom_times_list.selectedItems()
-        if not selected_items:
-            return
-            
-        for item in selected_items:
-            self.custom_times_list.takeItem(self.custom_times_list.row(item))
+        # 从后往前删除，避免行号变化
+        rows = sorted({index.row() for index in self.custom_times_list.selectedIndexes()}, reverse=True)
+        for row in rows:
+            self.custom_times_model.removeRows(row, 1)
             
     def create_logs_tab(self):
-        """创建日志选项卡"""
+        """
+        创建日志选项卡
+        
+        Returns:
+            QWidget: 选项卡内容
+        """
         logs_tab = QWidget()
         layout = QVBoxLayout(logs_tab)
         
         # 日志显示区域
-        self.log_text = QTextEdit()
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
+        # 限制显示的行数，超出时自动丢弃最早的日志
+        self.log_text.setMaximumBlockCount(LOG_MAX_LINES)
         layout.addWidget(self.log_text)
         
         # 日志操作按钮
@@ -695,120 +1014,134 @@ class ScreenMailerGUI(QMainWindow):
         log_buttons.addWidget(self.clear_logs_btn)
         
         self.open_log_dir_btn = QPushButton("打开日志目录")
-        self.open_log_dir_btn.clicked.connect(lambda: os.startfile(self.log_dir))
+        self.open_log_dir_btn.clicked.connect(self.open_log_dir)
         log_buttons.addWidget(self.open_log_dir_btn)
         
         layout.addLayout(log_buttons)
         
-        # 添加日志选项卡
-        self.tabs.addTab(logs_tab, "日志")
-        
         # 初始化日志内容
         self.refresh_logs()
         
+        # 新日志记录直接推送到日志选项卡，使用排队连接保证工作线程中的日志在界面线程显示
+        self.log_handler = QtLogHandler()
+        self.log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(filename)s:%(lineno)d - %(message)s'))
+        self.log_handler.new_record.connect(self.log_text.appendPlainText, Qt.QueuedConnection)
+        logging.getLogger().addHandler(self.log_handler)
+        
+        return logs_tab
+        
+    def open_log_dir(self):
+        """在系统文件管理器中打开日志目录"""
+        QDesktopServices.openUrl(QUrl.fromLocalFile(self.log_dir))
+        
     def refresh_logs(self):
-        """刷新日志内容"""
+        """从磁盘重新加载日志内容，新日志由日志处理器实时推送，此处仅作为手动重新加载"""
         try:
-            # 获取最新日志文件
-            log_files = [f for f in os.listdir(self.log_dir) if f.endswith('.log')]
-            if not log_files:
+            log_path = get_active_log_file() or self._find_latest_log()
+            if not log_path or not os.path.exists(log_path):
                 self.log_text.setPlainText("无日志文件")
                 return
                 
-            # 按修改时间排序，取最新的日志文件
-            log_files.sort(key=lambda x: os.path.getmtime(os.path.join(self.log_dir, x)), reverse=True)
-            latest_log = os.path.join(self.log_dir, log_files[0])
-            
-            # 读取日志内容
-            with open(latest_log, 'r', encoding='utf-8') as f:
-                log_content = f.read()
+            # 只读取日志文件末尾部分
+            with open(log_path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                offset = max(0, f.tell() - LOG_TAIL_BYTES)
+                f.seek(offset)
+                chunk = f.read()
                 
-            # 显示日志内容
-            self.log_text.setPlainText(log_content)
+            # 从文件中间开始读取时丢弃第一行不完整的内容
+            if offset > 0:
+                chunk = chunk.split(b'\n', 1)[-1]
+                
+            self.log_text.setPlainText(chunk.decode('utf-8', 'replace').rstrip())
             
             # 滚动到底部
-            self.log_text.moveCursor(QTextCursor.End)
+            scroll_bar = self.log_text.verticalScrollBar()
+            scroll_bar.setValue(scroll_bar.maximum())
             
         except Exception as e:
             self.log_text.setPlainText(f"读取日志失败: {str(e)}")
             
+    def _find_latest_log(self):
+        """
+        查找日志目录中最新的日志文件
+        
+        Returns:
+            str: 日志文件路径，没有日志文件时返回None
+        """
+        # scandir返回的目录项会缓存stat结果，避免对每个文件重复stat
+        with os.scandir(self.log_dir) as it:
+            entries = [entry for entry in it if entry.name.endswith('.log') and entry.is_file()]
+        if not entries:
+            return None
+            
+        # 取修改时间最新的日志文件
+        return max(entries, key=lambda entry: entry.stat().st_mtime).path
+            
     def clear_logs(self):
         """清空日志显示"""
         self.log_text.clear()
         
     def update_config_from_ui(self):
-        """从UI更新配置"""
-        # 邮件配置
-        email_config = {}
-        email_config['smtp_server'] = self.smtp_server_input.text()
-        email_config['smtp_port'] = self.smtp_port_input.value()
-        email_config['use_ssl'] = self.use_ssl_checkbox.isChecked()
-        email_config['username'] = self.username_input.text()
-        email_config['password'] = self.password_input.text()
-        email_config['sender_email'] = self.sender_email_input.text()
-        
-        # 收件人列表
-        recipients = []
-        for i in range(self.recipients_list.count()):
-            recipients.append(self.recipients_list.item(i).text())
-        email_config['recipients'] = recipients
-        
-        email_config['subject_prefix'] = self.subject_prefix_input.text()
-        
-        # 更新邮件配置
-        self.config['email'] = email_config
-        
-        # 截图配置
-        screenshot_config = {}
-        screenshot_config['format'] = self.format_combo.currentText()
-        screenshot_config['quality'] = self.quality_spinbox.value()
+        """从UI更新配置，尚未创建的选项卡保留原有配置，界面未修改时直接返回"""
+        if not self.ui_dirty:
+            return
+        self.ui_dirty = False
+        self.config_update_timer.stop()
         
-        # 截图区域
-        if self.fullscreen_checkbox.isChecked():
-            screenshot_config['bbox'] = None
-        else:
-            screenshot_config['bbox'] = [
-                self.left_input.value(),
-                self.top_input.value(),
-                self.right_input.value(),
-                self.bottom_input.value()
-            ]
-            
-        # 更新截图配置
-        self.config['screenshot'] = screenshot_config
+        # 邮件配置
+        if self.tab_built[TAB_EMAIL]:
+            self.update_config_section('email', {
+                'smtp_server': self.smtp_server_input.text(),
+                'smtp_port': self.smtp_port_input.value(),
+                'use_ssl': self.use_ssl_checkbox.isChecked(),
+                'username': self.username_input.text(),
+                'password': self.password_input.text(),
+                'sender_email': self.sender_email_input.text(),
+                'recipients': self.recipients_model.stringList(),
+                'subject_prefix': self.subject_prefix_input.text()
+            })
+        
+        # 截图配置，全屏时截图区域为None
+        if self.tab_built[TAB_SCREENSHOT]:
+            self.update_config_section('screenshot', {
+                'format': IMAGE_FORMATS[self.format_combo.currentIndex()],
+                'quality': self.quality_spinbox.value(),
+                'bbox': None if self.fullscreen_checkbox.isChecked() else [
+                    self.left_input.value(),
+                    self.top_input.value(),
+                    self.right_input.value(),
+                    self.bottom_input.value()
+                ]
+            })
         
         # 调度器配置
-        scheduler_config = {}
-        scheduler_config['screenshot_interval'] = self.screenshot_interval_spinbox.value()
-        scheduler_config['screenshot_count'] = self.screenshot_count_spinbox.value()
-        scheduler_config['screenshot_delay'] = self.screenshot_delay_spinbox.value()
-        
-        # 邮件发送模式
-        email_mode_index = self.email_mode_combo.currentIndex()
-        if email_mode_index == 0:
-            scheduler_config['email_mode'] = 'interval'
-        elif email_mode_index == 1:
-            scheduler_config['email_mode'] = 'hourly'
-        elif email_mode_index == 2:
-            scheduler_config['email_mode'] = 'half_hourly'
-        elif email_mode_index == 3:
-            scheduler_config['email_mode'] = 'custom'
-            
-        scheduler_config['email_interval'] = self.email_interval_spinbox.value()
-        
-        # 自定义时间
-        custom_times = []
-        for i in range(self.custom_times_list.count()):
-            custom_times.append(self.custom_times_list.item(i).text())
-        scheduler_config['email_custom_times'] = custom_times
-        
-        # 其他选项
-        scheduler_config['send_immediate'] = self.send_immediate_checkbox.isChecked()
-        scheduler_config['send_with_capture'] = self.send_with_capture_checkbox.isChecked()
-        
-        # 更新调度器配置
-        self.config['scheduler'] = scheduler_config
-        
+        if self.tab_built[TAB_SCHEDULER]:
+            self.update_config_section('scheduler', {
+                'screenshot_interval': self.screenshot_interval_spinbox.value(),
+                'screenshot_count': self.screenshot_count_spinbox.value(),
+                'screenshot_delay': self.screenshot_delay_spinbox.value(),
+                'email_mode': EMAIL_MODES[self.email_mode_combo.currentIndex()],
+                'email_interval': self.email_interval_spinbox.value(),
+                'email_custom_times': self.custom_times_model.stringList(),
+                'send_immediate': self.send_immediate_checkbox.isChecked(),
+                'send_with_capture': self.send_with_capture_checkbox.isChecked()
+            })
+            
+    def update_config_section(self, section, values):
+        """
+        更新配置中的一个部分，有变化时原地修改并标记为待保存
+        
+        Args:
+            section (str): 配置部分名称
+            values (dict): 从界面读取的配置值
+        """
+        current = self.config.setdefault(section, {})
+        changed = {key: value for key, value in values.items() if key not in current or current[key] != value}
+        if changed:
+            current.update(changed)
+            self.dirty_sections.add(section)
+            
     def toggle_monitoring(self):
         """切换监控状态"""
         if self.is_running:
@@ -817,53 +1150,133 @@ class ScreenMailerGUI(QMainWindow):
             self.start_monitoring()
             
     def start_monitoring(self):
-        """启动监控"""
+        """启动监控，耗时的模块初始化在后台线程中执行"""
         try:
             # 保存当前配置
             self.update_config_from_ui()
-            
-            # 创建截图模块
-            screen_capture = ScreenCapture(
-                self.screenshot_dir, 
-                self.config['screenshot']
-            )
-            
-            # 创建邮件发送模块
-            email_sender = EmailSender(self.config['email'])
-            
-            # 创建调度器
-            self.scheduler = Scheduler(
-                screen_capture=screen_capture,
-                email_sender=email_sender,
-                config=self.config['scheduler']
-            )
-            
-            # 启动调度器
-            self.scheduler.start()
-            
-            # 更新状态
-            self.is_running = True
-            self.start_stop_button.setText("停止监控")
-            self.status_label.setText("正在运行")
-            
-            # 记录启动时间
-            self.start_time = datetime.now()
-            
-            logger.info("监控已启动")
-            QMessageBox.information(self, "成功", "监控已启动")
-            
         except Exception as e:
             logger.error(f"启动监控失败: {str(e)}")
             QMessageBox.critical(self, "错误", f"启动监控失败: {str(e)}")
+            return
+            
+        # 初始化期间禁用按钮，避免重复启动
+        self.start_stop_button.setEnabled(False)
+        self.status_label.setText("正在启动")
+        
+        # 已有暂停的调度器时复用，配置有变化才更新
+        email_config = dict(self.config['email'])
+        scheduler_config = dict(self.config['scheduler'])
+        config_changed = (email_config, scheduler_config) != self.scheduler_config_snapshot
+        self.scheduler_config_snapshot = (email_config, scheduler_config)
+        
+        self.startup_worker = Worker(
+            self._start_scheduler,
+            dict(self.config['screenshot']),
+            email_config,
+            scheduler_config,
+            config_changed
+        )
+        self.startup_worker.signals.finished.connect(self.on_monitoring_started)
+        self.startup_worker.signals.failed.connect(self.on_monitoring_failed)
+        QThreadPool.globalInstance().start(self.startup_worker)
+        
+    def _start_scheduler(self, screenshot_config, email_config, scheduler_config, config_changed):
+        """
+        启动调度器，在后台线程中执行。已有暂停的调度器时更新配置后恢复运行，否则新建调度器
+        
+        Args:
+            screenshot_config (dict): 截图配置
+            email_config (dict): 邮件配置
+            scheduler_config (dict): 调度器配置
+            config_changed (bool): 配置相对上次启动是否有变化
+            
+        Returns:
+            Scheduler: 已启动的调度器
+        """
+        screen_capture = self.get_screen_capture(screenshot_config)
+        
+        scheduler = self.scheduler
+        if scheduler is not None:
+            # 暂停时仍在执行的任务完成后才能更新配置，更新邮件配置会关闭其正在使用的连接
+            scheduler.wait_stopped()
+            if config_changed:
+                scheduler.email_sender.update_config(email_config)
+                scheduler.update_config(scheduler_config)
+            scheduler.screen_capture = screen_capture
+            scheduler.email_sender.set_image_format(screen_capture.format)
+            scheduler.resume()
+            return scheduler
+            
+        from src.mailer.sender import EmailSender
+        from src.scheduler.scheduler import Scheduler
+        
+        # 创建邮件发送模块
+        email_sender = EmailSender(email_config, image_format=screen_capture.format)
+        
+        # 创建调度器
+        scheduler = Scheduler(
+            screen_capture=screen_capture,
+            email_sender=email_sender,
+            config=scheduler_config,
+            on_capture=self.scheduler_bridge.screenshot_captured.emit,
+            on_email_sent=self.scheduler_bridge.email_sent.emit,
+            on_error=self.scheduler_bridge.error.emit
+        )
+        
+        # 启动调度器
+        scheduler.start()
+        return scheduler
+        
+    @pyqtSlot(object)
+    def on_monitoring_started(self, scheduler):
+        """
+        调度器启动完成
+        
+        Args:
+            scheduler (Scheduler): 已启动的调度器
+        """
+        self.startup_worker = None
+        self.scheduler = scheduler
+        
+        # 更新状态
+        self.is_running = True
+        self.start_stop_button.setText("停止监控")
+        self.start_stop_button.setEnabled(True)
+        self.status_label.setText("正在运行")
+        
+        # 记录启动时间
+        self.start_time = time.monotonic()
+        self.update_status()
+        self.status_timer.start()
+        
+        logger.info("监控已启动")
+        QMessageBox.information(self, "成功", "监控已启动")
+        
+    @pyqtSlot(str)
+    def on_monitoring_failed(self, error):
+        """
+        调度器启动失败
+        
+        Args:
+            error (str): 错误信息
+        """
+        self.startup_worker = None
+        self.scheduler_config_snapshot = None
+        self.start_stop_button.setEnabled(True)
+        self.status_label.setText("未运行")
+        
+        logger.error(f"启动监控失败: {error}")
+        QMessageBox.critical(self, "错误", f"启动监控失败: {error}")
             
     def stop_monitoring(self):
         """停止监控"""
+        # 暂停而不销毁调度器，再次启动时直接恢复
         if self.scheduler:
-            self.scheduler.stop()
-            self.scheduler = None
+            self.scheduler.pause()
             
         # 更新状态
         self.is_running = False
+        self.status_timer.stop()
         self.start_stop_button.setText("启动监控")
         self.status_label.setText("未运行")
         
@@ -871,98 +1284,245 @@ class ScreenMailerGUI(QMainWindow):
         QMessageBox.information(self, "成功", "监控已停止")
         
     def capture_and_send(self):
-        """立即截图并发送"""
+        """立即截图并发送，截图和发送在后台线程中执行"""
         try:
             # 保存当前配置
             self.update_config_from_ui()
+        except Exception as e:
+            logger.error(f"手动截图和发送失败: {str(e)}")
+            QMessageBox.critical(self, "错误", f"操作失败: {str(e)}")
+            return
             
-            # 创建临时截图模块
-            screen_capture = ScreenCapture(
-                self.screenshot_dir,
-                self.config['screenshot']
-            )
-            
-            # 创建临时邮件发送模块
-            email_sender = EmailSender(self.config['email'])
+        # 发送完成前禁用按钮，避免重复点击
+        self.capture_send_button.setEnabled(False)
+        
+        self.send_worker = Worker(
+            self._capture_and_send,
+            dict(self.config['screenshot']),
+            dict(self.config['email']),
+            dict(self.config.get('scheduler', {}))
+        )
+        self.send_worker.signals.finished.connect(self.on_capture_and_send_finished)
+        self.send_worker.signals.failed.connect(self.on_capture_and_send_failed)
+        QThreadPool.globalInstance().start(self.send_worker)
+        
+    def _capture_and_send(self, screenshot_config, email_config, scheduler_config):
+        """
+        截图并发送邮件，在后台线程中执行，仪表盘通过信号桥在界面线程中更新
+        
+        Args:
+            screenshot_config (dict): 截图配置
+            email_config (dict): 邮件配置
+            scheduler_config (dict): 调度器配置
             
+        Returns:
+            tuple: (截图数量, 是否发送成功)，截图失败时截图数量为0
+        """
+        from src.mailer.sender import EmailSender
+        
+        # 获取截图模块
+        screen_capture = self.get_screen_capture(screenshot_config)
+        
+        # 创建临时邮件发送模块，配置不完整时在截图前报错；发送后立即关闭连接，不保留已登录的会话
+        email_sender = EmailSender(email_config, image_format=screen_capture.format)
+        try:
             # 截图
             logger.info("执行手动截图")
             screenshot_paths = screen_capture.capture_multi(
-                count=self.screenshot_count_spinbox.value(),
-                interval=self.screenshot_delay_spinbox.value()
+                count=scheduler_config.get('screenshot_count', 1),
+                interval=scheduler_config.get('screenshot_delay', 0.5)
             )
             
             if not screenshot_paths:
-                logger.warning("截图失败")
-                QMessageBox.warning(self, "失败", "截图失败，请检查设置")
-                return
-                
+                return 0, False
+            
             # 更新时间和计数
-            now_str = datetime.now().strftime("%Y-%m-%d  %H:%M:%S")
-            self.last_screenshot_time = now_str
-            self.total_screenshots += len(screenshot_paths)
-            self.unsent_screenshot_count += len(screenshot_paths)
-            self.update_dashboard_counters()
+            captured_at = time.time()
+            for path in screenshot_paths:
+                self.scheduler_bridge.screenshot_captured.emit(path, captured_at)
             
             # 发送邮件
             logger.info(f"发送手动截图邮件，共{len(screenshot_paths)}张")
-            result = email_sender.send_monitor_email(screenshot_paths)
+            result = email_sender.send_monitor_email(
+                screenshot_paths,
+                blobs=[screen_capture.get_bytes(path) for path in screenshot_paths]
+            )
             
             if result:
-                self.last_email_time = now_str
-                self.total_emails += 1
-                self.unsent_screenshot_count = 0
-                self.update_dashboard_counters()
-                logger.info("手动发送邮件成功")
-                QMessageBox.information(self, "成功", f"已成功发送{len(screenshot_paths)}张截图")
+                self.scheduler_bridge.email_sent.emit(len(screenshot_paths), time.time())
                 
                 # 清理截图
                 screen_capture.cleanup_screenshots(screenshot_paths)
             else:
-                logger.error("手动发送邮件失败")
-                QMessageBox.warning(self, "失败", "发送邮件失败，请检查邮件设置")
-                
-        except Exception as e:
-            logger.error(f"手动截图和发送失败: {str(e)}")
-            QMessageBox.critical(self, "错误", f"操作失败: {str(e)}")
+                # 手动截图发送失败后不会重试，只保留磁盘上的文件
+                screen_capture.discard_bytes(screenshot_paths)
+            
+            return len(screenshot_paths), result
+        finally:
+            email_sender.close()
+        
+    @pyqtSlot(object)
+    def on_capture_and_send_finished(self, outcome):
+        """
+        手动截图和发送完成
+        
+        Args:
+            outcome (tuple): (截图数量, 是否发送成功)
+        """
+        self.send_worker = None
+        self.capture_send_button.setEnabled(True)
+        
+        count, result = outcome
+        if not count:
+            logger.warning("截图失败")
+            QMessageBox.warning(self, "失败", "截图失败，请检查设置")
+        elif result:
+            logger.info("手动发送邮件成功")
+            QMessageBox.information(self, "成功", f"已成功发送{count}张截图")
+        else:
+            logger.error("手动发送邮件失败")
+            QMessageBox.warning(self, "失败", "发送邮件失败，请检查邮件设置")
+            
+    @pyqtSlot(str)
+    def on_capture_and_send_failed(self, error):
+        """
+        手动截图和发送出错
+        
+        Args:
+            error (str): 错误信息
+        """
+        self.send_worker = None
+        self.capture_send_button.setEnabled(True)
+        
+        logger.error(f"手动截图和发送失败: {error}")
+        QMessageBox.critical(self, "错误", f"操作失败: {error}")
             
     def send_test_email(self):
-        """发送测试邮件"""
+        """发送测试邮件，SMTP登录和发送在后台线程中执行"""
         try:
             # 保存当前配置
             self.update_config_from_ui()
-            
-            # 创建临时邮件发送模块
-            email_sender = EmailSender(self.config['email'])
-            
-            # 发送测试邮件
-            logger.info("发送测试邮件")
-            subject = "测试邮件"
-            message = "这是一封来自ScreenMailer的测试邮件。\n\n如果您收到此邮件，说明邮件配置正确。"
-            
-            result = email_sender.send_email(subject, message)
-            
-            if result:
-                logger.info("测试邮件发送成功")
-                QMessageBox.information(self, "成功", "测试邮件已成功发送")
-            else:
-                logger.error("测试邮件发送失败")
-                QMessageBox.warning(self, "失败", "测试邮件发送失败，请检查邮件设置")
-                
         except Exception as e:
             logger.error(f"发送测试邮件失败: {str(e)}")
             QMessageBox.critical(self, "错误", f"发送测试邮件失败: {str(e)}")
+            return
+            
+        # 发送完成前禁用按钮，避免重复点击
+        self.test_email_btn.setEnabled(False)
+        
+        self.test_email_worker = Worker(self._send_test_email, dict(self.config['email']))
+        self.test_email_worker.signals.finished.connect(self.on_test_email_finished)
+        self.test_email_worker.signals.failed.connect(self.on_test_email_failed)
+        QThreadPool.globalInstance().start(self.test_email_worker)
+        
+    def _send_test_email(self, email_config):
+        """
+        发送测试邮件，在后台线程中执行
+        
+        Args:
+            email_config (dict): 邮件配置
+            
+        Returns:
+            bool: 发送成功返回True，失败返回False
+        """
+        from src.mailer.sender import EmailSender
+        
+        # 创建临时邮件发送模块，发送后立即关闭连接，不保留已登录的会话
+        email_sender = EmailSender(email_config)
+        
+        # 发送测试邮件
+        logger.info("发送测试邮件")
+        subject = "测试邮件"
+        message = "这是一封来自ScreenMailer的测试邮件。\n\n如果您收到此邮件，说明邮件配置正确。"
+        
+        try:
+            return email_sender.send_email(subject, message)
+        finally:
+            email_sender.close()
+        
+    @pyqtSlot(object)
+    def on_test_email_finished(self, result):
+        """
+        测试邮件发送完成
+        
+        Args:
+            result (bool): 是否发送成功
+        """
+        self.test_email_worker = None
+        self.test_email_btn.setEnabled(True)
+        
+        if result:
+            logger.info("测试邮件发送成功")
+            QMessageBox.information(self, "成功", "测试邮件已成功发送")
+        else:
+            logger.error("测试邮件发送失败")
+            QMessageBox.warning(self, "失败", "测试邮件发送失败，请检查邮件设置")
+            
+    @pyqtSlot(str)
+    def on_test_email_failed(self, error):
+        """
+        测试邮件发送出错
+        
+        Args:
+            error (str): 错误信息
+        """
+        self.test_email_worker = None
+        self.test_email_btn.setEnabled(True)
+        
+        logger.error(f"发送测试邮件失败: {error}")
+        QMessageBox.critical(self, "错误", f"发送测试邮件失败: {error}")
             
     def update_status(self):
-        """更新状态信息"""
+        """更新运行时间"""
         if self.is_running:
-            # 更新运行时间
-            run_duration = datetime.now() - self.start_time
-            hours, remainder = divmod(run_duration.seconds, 3600)
-            minutes, seconds = divmod(remainder, 60)
-            self.run_time_label.setText(f"{hours:02d}:{minutes:02d}:{seconds:02d}")
-        self.update_dashboard_counters()
+            # 使用单调时钟计算，不受系统时间调整影响
+            elapsed = int(time.monotonic() - self.start_time)
+            run_time_text = f"{elapsed // 3600:02d}:{elapsed // 60 % 60:02d}:{elapsed % 60:02d}"
             
+            # 文本未变化时不重新设置，避免标签重新布局
+            if run_time_text != self.run_time_text:
+                self.run_time_text = run_time_text
+                self.run_time_label.setText(run_time_text)
+            
+    @pyqtSlot(str, float)
+    def on_screenshot_captured(self, path, timestamp):
+        """
+        截图完成后更新仪表盘
+        
+        Args:
+            path (str): 截图文件路径
+            timestamp (float): 截图时间戳
+        """
+        self.last_screenshot_time = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d  %H:%M:%S")
+        self.total_screenshots += 1
+        self.unsent_screenshot_count += 1
+        self.update_dashboard_counters()
+        
+    @pyqtSlot(int, float)
+    def on_email_sent(self, count, timestamp):
+        """
+        邮件发送成功后更新仪表盘
+        
+        Args:
+            count (int): 发送的截图数量
+            timestamp (float): 发送时间戳
+        """
+        self.last_email_time = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d  %H:%M:%S")
+        self.total_emails += 1
+        self.unsent_screenshot_count = max(0, self.unsent_screenshot_count - count)
+        self.update_dashboard_counters()
+        
+    @pyqtSlot(str)
+    def on_scheduler_error(self, message):
+        """
+        调度任务失败时在状态栏显示错误信息
+        
+        Args:
+            message (str): 错误信息
+        """
+        self.statusBar().showMessage(f"{datetime.now().strftime('%H:%M:%S')} {message}", 10000)
+        
+
     def update_dashboard_counters(self):
         self.last_screenshot_label.setText(self.last_screenshot_time or "无")
         self.last_email_label.setText(self.last_email_time or "无")
@@ -972,6 +1532,8 @@ class ScreenMailerGUI(QMainWindow):
             
 def main():
     """主函数"""
+    # 不为原生子窗口的兄弟控件创建原生窗口句柄，需在创建QApplication前设置
+    QApplication.setAttribute(Qt.AA_DontCreateNativeWidgetSiblings)
     app = QApplication(sys.argv)
     window = ScreenMailerGUI()
     window.show()
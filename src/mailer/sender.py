@@ -0,0 +1,365 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+邮件发送模块
+负责将截图通过邮件发送
+"""
+
+import os
+import mmap
+import base64
+import atexit
+import logging
+import platform
+import weakref
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# 系统信息在进程运行期间不变，只获取一次
+_SYSTEM = platform.system()
+_HOSTNAME = platform.node()
+
+# 邮件正文中不随每次发送变化的部分，只构建一次
+_MONITOR_HEADER = f"""=====基本情况=======
+主机名称: {_HOSTNAME}
+操作系统: {_SYSTEM}
+"""
+_ALERT_HEADER = f"""=====告警信息=======
+【告警】来自ScreenMailer的告警通知！
+
+主机名称: {_HOSTNAME}
+操作系统: {_SYSTEM}
+"""
+_SIGNATURE = "---------------------\n\n---\n此邮件由ScreenMailer系统自动发送，请勿回复。"
+
+# 截图格式与MIME图片子类型不一致的映射
+_IMAGE_SUBTYPES = {'jpg': 'jpeg'}
+
+# 持有SMTP连接的发送器，进程退出时统一关闭连接
+_open_senders = weakref.WeakSet()
+
+@atexit.register
+def _close_all_senders():
+    """进程退出时关闭所有保持中的SMTP连接"""
+    for sender in list(_open_senders):
+        sender.close()
+
+def _map_attachment(path):
+    """
+    以只读内存映射方式打开附件，编码时直接读取系统页缓存，不复制到Python缓冲区
+    
+    Args:
+        path (str): 文件路径
+        
+    Returns:
+        tuple: (文件名, 文件内容)，文件内容为mmap对象，空文件为b''，文件不存在时返回None
+    """
+    try:
+        with open(path, 'rb') as f:
+            # 长度为0的文件无法映射
+            if os.fstat(f.fileno()).st_size == 0:
+                return os.path.basename(path), b''
+            return os.path.basename(path), mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+
+class EmailSender:
+    """邮件发送类"""
+    
+    def __init__(self, config, image_format=None):
+        """
+        初始化邮件发送模块
+        
+        Args:
+            config (dict): 邮件相关配置
+            image_format (str, optional): 截图格式，提供时附件直接使用对应的MIME类型，不再逐个检测
+        """
+        # 保持的SMTP连接，多次发送时复用
+        self._smtp = None
+        
+        self.set_image_format(image_format)
+        self.update_config(config)
+        logger.info("邮件发送模块初始化完成")
+        
+    def update_config(self, config):
+        """
+        更新邮件配置
+        
+        Args:
+            config (dict): 邮件相关配置
+            
+        Raises:
+            ValueError: 邮件服务器配置不完整
+        """
+        # 服务器或账号可能已变化，关闭旧连接
+        self.close()
+        
+        self.smtp_server = config.get('smtp_server')
+        self.smtp_port = config.get('smtp_port', 587)
+        self.use_ssl = config.get('use_ssl', False)
+        self.username = config.get('username')
+        self.password = config.get('password')
+        self.sender_email = config.get('sender_email', self.username)
+        self.recipients = config.get('recipients', [])
+        self.subject_prefix = config.get('subject_prefix', '[ScreenMailer]')
+        
+        if not self.smtp_server or not self.username or not self.password:
+            raise ValueError("邮件服务器配置不完整")
+    
+    def send_email(self, subject, message, screenshot_paths=None, log_records=None, blobs=None):
+        """
+        发送带有截图附件的邮件
+        
+        Args:
+            subject (str): 邮件主题
+            message (str): 邮件正文
+            screenshot_paths (list): 截图文件路径列表
+            log_records (list): 日志记录列表
+            blobs (list): 与截图路径一一对应的截图内容，为None的项从磁盘读取
+            
+        Returns:
+            bool: 发送成功返回True，失败返回False
+        """
+        return self.send_many([(subject, message, screenshot_paths, log_records, blobs)])[0]
+        
+    def send_many(self, items):
+        """
+        在同一个SMTP连接上依次发送多封邮件，每封邮件之间重置会话状态
+        
+        Args:
+            items (list): 邮件列表，每项为(主题, 正文, 截图文件路径列表[, 日志记录列表[, 截图内容列表]])
+            
+        Returns:
+            list: 每封邮件的发送结果，成功为True，失败为False
+        """
+        if not self.recipients:
+            logger.warning("未配置收件人，邮件未发送")
+            return [False] * len(items)
+            
+        # smtplib及其依赖的ssl等模块只在实际发送邮件时才导入
+        import smtplib
+        
+        results = []
+        for item in items:
+            try:
+                msg = self._build_message(*item)
+                
+                # 发送邮件，连接在检查后被服务器关闭时重连并重试一次
+                try:
+                    self._get_smtp().send_message(msg)
+                except smtplib.SMTPServerDisconnected:
+                    self.close()
+                    self._get_smtp().send_message(msg)
+                    
+                logger.info(f"邮件发送成功，收件人: {len(self.recipients)}人")
+                results.append(True)
+                
+            except Exception as e:
+                logger.error(f"邮件发送失败: {str(e)}")
+                results.append(False)
+                
+        return results
+        
+    def _build_message(self, subject, message, screenshot_paths=None, log_records=None, blobs=None):
+        """
+        构建带有截图附件的邮件
+        
+        Args:
+            subject (str): 邮件主题
+            message (str): 邮件正文
+            screenshot_paths (list): 截图文件路径列表
+            log_records (list): 日志记录列表
+            blobs (list): 与截图路径一一对应的截图内容，为None的项从磁盘读取
+            
+        Returns:
+            MIMEMultipart: 邮件内容
+        """
+        from email.mime.base import MIMEBase
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+        from email.mime.image import MIMEImage
+        
+        # 创建邮件
+        msg = MIMEMultipart()
+        msg['From'] = self.sender_email
+        msg['To'] = ', '.join(self.recipients)
+        msg['Subject'] = f"{self.subject_prefix} {subject}"
+        
+        # 如果有日志记录，添加到邮件正文
+        if log_records:
+            message += self._format_logs_for_email(log_records)
+        
+        # 添加正文
+        msg.attach(MIMEText(message, 'plain'))
+        
+        # 添加截图附件
+        if screenshot_paths and isinstance(screenshot_paths, list):
+            # 已有内容的截图直接使用，其余附件通过内存映射从磁盘读取
+            if blobs is None:
+                blobs = [None] * len(screenshot_paths)
+                
+            for path, blob in zip(screenshot_paths, blobs):
+                attachment = (os.path.basename(path), blob) if blob is not None else _map_attachment(path)
+                if attachment is None:
+                    logger.warning(f"截图文件不存在: {path}")
+                    continue
+                    
+                filename, img_data = attachment
+                try:
+                    if self._img_subtype:
+                        # 已知图片类型时直接构建MIME部分，用C实现的base64编码（按76字符分行）代替逐块编码
+                        image = MIMEBase('image', self._img_subtype)
+                        image.set_payload(base64.encodebytes(img_data).decode('ascii'))
+                        image['Content-Transfer-Encoding'] = 'base64'
+                    else:
+                        image = MIMEImage(bytes(img_data))
+                finally:
+                    # 编码完成后立即释放映射，之后才能删除截图文件
+                    if isinstance(img_data, mmap.mmap):
+                        img_data.close()
+                image.add_header('Content-Disposition', 
+                                'attachment', 
+                                filename=filename)
+                msg.attach(image)
+                
+        return msg
+    
+    def set_image_format(self, image_format):
+        """
+        设置截图格式
+        
+        Args:
+            image_format (str): 截图格式，为None时由MIMEImage根据文件内容检测类型
+        """
+        if image_format:
+            image_format = image_format.lower()
+            self._img_subtype = _IMAGE_SUBTYPES.get(image_format, image_format)
+        else:
+            self._img_subtype = None
+            
+    def _get_smtp(self):
+        """
+        获取可用的SMTP连接，复用已登录的连接，连接失效时重新连接
+        
+        Returns:
+            smtplib.SMTP: 已登录的SMTP连接
+        """
+        import smtplib
+        
+        if self._smtp is not None:
+            try:
+                # 检查连接是否仍然有效，并重置上一封邮件的会话状态
+                self._smtp.noop()
+                self._smtp.rset()
+                return self._smtp
+            except (smtplib.SMTPException, OSError):
+                logger.info("SMTP连接已失效，重新连接")
+                self.close()
+                
+        # 连接到SMTP服务器
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port)
+        else:
+            smtp = smtplib.SMTP(self.smtp_server, self.smtp_port)
+            smtp.starttls()
+            
+        # 登录
+        try:
+            smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+            
+        self._smtp = smtp
+        _open_senders.add(self)
+        return smtp
+        
+    def ping(self):
+        """
+        向保持的SMTP连接发送NOOP，避免连接因空闲被服务器关闭，连接失效时将其关闭
+        
+        Returns:
+            bool: 连接可用返回True，没有保持的连接或连接已失效返回False
+        """
+        if self._smtp is None:
+            return False
+            
+        import smtplib
+        try:
+            self._smtp.noop()
+            return True
+        except (smtplib.SMTPException, OSError):
+            logger.info("SMTP连接已失效，下次发送时重新连接")
+            self.close()
+            return False
+            
+    def close(self):
+        """关闭保持的SMTP连接"""
+        smtp, self._smtp = self._smtp, None
+        _open_senders.discard(self)
+        if smtp is None:
+            return
+            
+        import smtplib
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+            
+    def _format_logs_for_email(self, log_records):
+        """
+        格式化日志记录为邮件正文格式
+        
+        Args:
+            log_records (list): 日志记录列表
+            
+        Returns:
+            str: 格式化后的日志文本
+        """
+        if not log_records:
+            return ""
+            
+        # 一次拼接所有记录，避免逐条追加字符串
+        return "\n\n=====LOGS=====\n" + "\n".join(map(str, log_records)) + "\n=============\n"
+            
+    def send_monitor_email(self, screenshot_paths, log_records=None, blobs=None):
+        """
+        发送监控邮件
+        
+        Args:
+            screenshot_paths (list): 截图文件路径列表
+            log_records (list): 日志记录列表
+            blobs (list): 与截图路径一一对应的截图内容，为None的项从磁盘读取
+            
+        Returns:
+            bool: 发送成功返回True，失败返回False
+        """
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        subject = f"监控截图 - {timestamp}"
+        
+        message = (f"{_MONITOR_HEADER}截图时间: {timestamp}\n"
+                   f"截图数量: {len(screenshot_paths) if screenshot_paths else 0}\n"
+                   f"邮件生成时间: {timestamp}\n{_SIGNATURE}")
+        
+        return self.send_email(subject, message, screenshot_paths, log_records, blobs)
+        
+    def send_alert_email(self, message, screenshot_paths=None, log_records=None):
+        """
+        发送告警邮件
+        
+        Args:
+            message (str): 告警信息
+            screenshot_paths (list): 截图文件路径列表
+            log_records (list): 日志记录列表
+            
+        Returns:
+            bool: 发送成功返回True，失败返回False
+        """
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        subject = f"告警通知 - {timestamp}"
+        
+        alert_message = f"{_ALERT_HEADER}告警时间: {timestamp}\n告警信息: {message}\n{_SIGNATURE}"
+        
+        return self.send_email(subject, alert_message, screenshot_paths, log_records)
\ No newline at end of file
@@ -6,43 +6,50 @@ ScreenMailer - 自动屏幕截图和邮件发送监控工具
 主程序入口文件
 """
 
-import os
 import sys
 import time
 import logging
 from datetime import datetime
+from pathlib import Path
+
+# 项目目录只在导入时解析一次
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+LOG_DIR = PROJECT_ROOT / 'logs'
+CONFIG_PATH = PROJECT_ROOT / 'config' / 'config.yaml'
+SCREENSHOT_DIR = PROJECT_ROOT / 'screenshots'
 
 # 添加项目根目录到系统路径，确保可以正确导入模块
-project_root = os.path.dirname(os.path.dirname(__file__))
+project_root = str(PROJECT_ROOT)
 if project_root not in sys.path:
     sys.path.append(project_root)
 
 # 导入项目模块 - 修正导入路径，避免与标准库冲突
 from src.screenshot.capture import ScreenCapture
-from src.email.sender import EmailSender  # 修改为完整导入路径
+from src.mailer.sender import EmailSender
 from src.scheduler.scheduler import Scheduler
 from src.config.config_manager import ConfigManager
 from src.utils.logger import setup_logger
+from src.utils.dpi import enable_dpi_awareness
 
 def main():
     """主程序入口函数"""
     # 初始化日志系统
-    log_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
-    logger = setup_logger(log_path)
+    logger = setup_logger(str(LOG_DIR))
     logger.info("ScreenMailer 启动中... %s", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
     
+    # 截图前设置DPI感知，获取物理分辨率的画面
+    enable_dpi_awareness()
+    
     try:
         # 加载配置
-        config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'config.yaml')
-        config_manager = ConfigManager(config_path)
+        config_manager = ConfigManager(str(CONFIG_PATH))
         config = config_manager.get_config()
         
         # 初始化截图模块
-        screenshot_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'screenshots')
-        screen_capture = ScreenCapture(screenshot_dir, config['screenshot'])
+        screen_capture = ScreenCapture(str(SCREENSHOT_DIR), config['screenshot'])
         
         # 初始化邮件发送模块
-        email_sender = EmailSender(config['email'])
+        email_sender = EmailSender(config['email'], image_format=config['screenshot'].get('format'))
         
         # 初始化调度器
         scheduler = Scheduler(
@@ -51,10 +58,18 @@ def main():
             config=config['scheduler']
         )
         
-        # 启动调度器
+        # 启动调度器，调度器在后台线程中运行，主线程等待直到用户中断
         logger.info("开始执行监控任务")
         scheduler.start()
         
+        try:
+            # 带超时等待，使Windows下也能响应Ctrl+C
+            while scheduler.thread.is_alive():
+                scheduler.thread.join(timeout=1)
+        except KeyboardInterrupt:
+            logger.info("收到中断信号，正在停止监控")
+            scheduler.stop()
+        
     except Exception as e:
         logger.error(f"程序发生错误: {str(e)}", exc_info=True)
         return 1
@@ -7,17 +7,104 @@
 """
 
 import time
+import heapq
+import bisect
 import logging
+import itertools
 import threading
-import schedule
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# 邮件中日志记录的格式
+_LOG_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+_LOG_RECORD_FORMAT = "[%s] %s"
+
+# 保持SMTP连接的心跳间隔(秒)，多数服务器会关闭空闲数分钟的连接
+SMTP_KEEPALIVE_INTERVAL = 240
+
+# 邮件中附带的日志记录条数上限，邮件长期发送失败时只保留最近的记录
+MAX_LOG_RECORDS = 1000
+
+# 按时钟时间触发的任务，计算下次时间时跳过这段时间内的时刻，避免提前唤醒造成重复执行
+_CLOCK_JOB_GUARD = timedelta(seconds=1)
+
+def _every(seconds):
+    """
+    生成固定间隔任务的延迟函数
+    
+    Args:
+        seconds (float): 间隔秒数
+        
+    Returns:
+        callable: 返回距下次执行秒数的函数
+    """
+    return lambda: seconds
+
+def _hourly_at(minute):
+    """
+    生成每小时指定分钟执行的任务的延迟函数
+    
+    Args:
+        minute (int): 分钟
+        
+    Returns:
+        callable: 返回距下次执行秒数的函数
+    """
+    def next_delay():
+        now = datetime.now()
+        target = now.replace(minute=minute, second=0, microsecond=0)
+        if target <= now + _CLOCK_JOB_GUARD:
+            target += timedelta(hours=1)
+        return (target - now).total_seconds()
+    return next_delay
+
+def _parse_minute_of_day(time_str):
+    """
+    解析"HH:MM"格式的时间
+    
+    Args:
+        time_str (str): 时间，格式为"HH:MM"
+        
+    Returns:
+        int: 当天的第几分钟
+        
+    Raises:
+        ValueError: 时间格式错误或超出范围
+    """
+    hour, minute = time_str.split(":")
+    hour, minute = int(hour), int(minute)
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"时间超出范围: {time_str}")
+    return hour * 60 + minute
+
+def _daily_at(minutes):
+    """
+    生成每天在若干指定时间执行的任务的延迟函数，通过二分查找确定下一个时间
+    
+    Args:
+        minutes (list): 每天执行的时刻(当天的第几分钟)，已排序且不重复
+        
+    Returns:
+        callable: 返回距下次执行秒数的函数
+    """
+    def next_delay():
+        now = datetime.now()
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        elapsed = (now + _CLOCK_JOB_GUARD - day_start).total_seconds() / 60
+        index = bisect.bisect_right(minutes, elapsed)
+        if index < len(minutes):
+            target = day_start + timedelta(minutes=minutes[index])
+        else:
+            target = day_start + timedelta(days=1, minutes=minutes[0])
+        return (target - now).total_seconds()
+    return next_delay
+
 class Scheduler:
     """任务调度器类"""
     
-    def __init__(self, screen_capture, email_sender, config):
+    def __init__(self, screen_capture, email_sender, config, on_capture=None, on_email_sent=None, on_error=None):
         """
         初始化调度器
         
@@ -25,13 +112,42 @@ class Scheduler:
             screen_capture: ScreenCapture实例
             email_sender: EmailSender实例
             config (dict): 调度器相关配置
+            on_capture (callable, optional): 每张截图完成后的回调，参数为截图路径和时间戳，在调度器线程中调用
+            on_email_sent (callable, optional): 邮件发送成功后的回调，参数为发送的截图数量和时间戳，在调度器线程中调用
+            on_error (callable, optional): 截图或邮件发送失败时的回调，参数为错误信息，在调度器线程中调用
         """
         self.screen_capture = screen_capture
         self.email_sender = email_sender
-        self.config = config
+        self.on_capture = on_capture
+        self.on_email_sent = on_email_sent
+        self.on_error = on_error
         self.is_running = False
         self.thread = None
         
+        # 定时任务堆，元素为(下次执行的单调时钟时间, 序号, 任务函数, 延迟函数)
+        self._jobs = []
+        self._job_seq = itertools.count()
+        self._wake = None
+        
+        self.update_config(config)
+        
+        # 保存的截图路径
+        self.screenshot_paths = []
+        
+        # 当前日志记录，元素为(时间戳, 消息)，发送邮件时才格式化
+        self.current_log_records = deque(maxlen=MAX_LOG_RECORDS)
+        
+        logger.info("调度器初始化完成")
+        
+    def update_config(self, config):
+        """
+        更新调度配置，新的定时任务在下次启动或恢复时生效
+        
+        Args:
+            config (dict): 调度器相关配置
+        """
+        self.config = config
+        
         # 截图相关配置
         self.screenshot_interval = config.get('screenshot_interval', 300)  # 默认5分钟
         self.screenshot_count = config.get('screenshot_count', 1)
@@ -46,19 +162,10 @@ class Scheduler:
         # 截图与邮件发送模式
         self.send_with_capture = config.get('send_with_capture', False)  # 截图后立即发送邮件
         
-        # 保存的截图路径
-        self.screenshot_paths = []
-        
-        # 当前日志记录
-        self.current_log_records = []
-        
-        logger.info("调度器初始化完成")
-        
     def _take_screenshots(self):
         """执行截图任务"""
-        logger.info(f"执行截图任务，将连续截取{self.screenshot_count}张截图")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.current_log_records.append(f"[{timestamp}] 开始执行截图任务")
+        logger.info("执行截图任务，将连续截取%s张截图", self.screenshot_count)
+        self._add_log_record("开始执行截图任务")
         
         new_screenshots = self.screen_capture.capture_multi(
             count=self.screenshot_count,
@@ -67,9 +174,13 @@ class Scheduler:
         
         if new_screenshots:
             self.screenshot_paths.extend(new_screenshots)
-            log_msg = f"截图任务完成，新增{len(new_screenshots)}张截图"
-            logger.info(log_msg)
-            self.current_log_records.append(f"[{timestamp}] {log_msg}")
+            logger.info("截图任务完成，新增%s张截图", len(new_screenshots))
+            self._add_log_record(f"截图任务完成，新增{len(new_screenshots)}张截图")
+            
+            if self.on_capture:
+                captured_at = time.time()
+                for path in new_screenshots:
+                    self.on_capture(path, captured_at)
             
             # 如果设置为截图后立即发送邮件
             if self.send_with_capture:
@@ -77,7 +188,10 @@ class Scheduler:
         else:
             log_msg = "截图任务失败，未获取任何截图"
             logger.warning(log_msg)
-            self.current_log_records.append(f"[{timestamp}] {log_msg}")
+            self._add_log_record(log_msg)
+            
+            if self.on_error:
+                self.on_error(log_msg)
             
         return new_screenshots
         
@@ -86,35 +200,63 @@ class Scheduler:
         if not self.screenshot_paths:
             log_msg = "没有可发送的截图"
             logger.warning(log_msg)
-            self.current_log_records.append(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {log_msg}")
+            self._add_log_record(log_msg)
             return False
             
-        logger.info(f"执行邮件发送任务，将发送{len(self.screenshot_paths)}张截图")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.current_log_records.append(f"[{timestamp}] 开始执行邮件发送任务，包含{len(self.screenshot_paths)}张截图")
+        logger.info("执行邮件发送任务，将发送%s张截图", len(self.screenshot_paths))
+        self._add_log_record(f"开始执行邮件发送任务，包含{len(self.screenshot_paths)}张截图")
         
-        # 将当前日志记录传递给邮件发送模块
+        # 将当前日志记录传递给邮件发送模块，截图内容优先使用截图模块中缓存的编码结果
         result = self.email_sender.send_monitor_email(
             self.screenshot_paths, 
-            log_records=self.current_log_records
+            log_records=self._format_log_records(),
+            blobs=[self.screen_capture.get_bytes(path) for path in self.screenshot_paths]
         )
         
         if result:
             log_msg = "邮件发送成功，清空截图和日志"
             logger.info(log_msg)
-            self.current_log_records.append(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {log_msg}")
+            
+            if self.on_email_sent:
+                self.on_email_sent(len(self.screenshot_paths), time.time())
             
             # 清空截图列表和日志记录
             self._cleanup_screenshots()
-            self.current_log_records = []
+            self.current_log_records.clear()
             
         else:
             log_msg = "邮件发送失败"
             logger.error(log_msg)
-            self.current_log_records.append(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {log_msg}")
+            self._add_log_record(log_msg)
+            
+            if self.on_error:
+                self.on_error(log_msg)
             
         return result
     
+    def _keep_alive(self):
+        """保持邮件发送模块的SMTP连接"""
+        self.email_sender.ping()
+        
+    def _add_log_record(self, message):
+        """
+        记录一条附带在邮件中的日志
+        
+        Args:
+            message (str): 日志消息
+        """
+        self.current_log_records.append((time.time(), message))
+        
+    def _format_log_records(self):
+        """
+        格式化当前日志记录
+        
+        Returns:
+            list: 格式为"[时间] 消息"的日志文本列表
+        """
+        return [_LOG_RECORD_FORMAT % (time.strftime(_LOG_TIME_FORMAT, time.localtime(timestamp)), message)
+                for timestamp, message in self.current_log_records]
+    
     def _cleanup_screenshots(self):
         """清理已发送的截图文件"""
         self.screen_capture.cleanup_screenshots(self.screenshot_paths)
@@ -122,25 +264,27 @@ class Scheduler:
             
     def _schedule_jobs(self):
         """设置定时任务"""
+        self._jobs = []
+        
         # 设置截图任务
-        schedule.every(self.screenshot_interval).seconds.do(self._take_screenshots)
+        self._add_job(self._take_screenshots, _every(self.screenshot_interval))
         logger.info(f"已设置截图任务，每{self.screenshot_interval}秒执行一次")
         
         # 根据不同的邮件发送模式设置任务
         if self.email_mode == 'interval':
             # 按间隔时间发送
-            schedule.every(self.email_interval).seconds.do(self._send_email)
+            self._add_job(self._send_email, _every(self.email_interval))
             logger.info(f"已设置邮件发送任务，每{self.email_interval}秒执行一次")
             
         elif self.email_mode == 'hourly':
             # 每整点发送
-            schedule.every().hour.at(":00").do(self._send_email)
+            self._add_job(self._send_email, _hourly_at(0))
             logger.info("已设置邮件发送任务，每小时整点执行")
             
         elif self.email_mode == 'half_hourly':
             # 每半小时发送
-            schedule.every().hour.at(":00").do(self._send_email)
-            schedule.every().hour.at(":30").do(self._send_email)
+            self._add_job(self._send_email, _hourly_at(0))
+            self._add_job(self._send_email, _hourly_at(30))
             logger.info("已设置邮件发送任务，每小时的:00和:30执行")
             
         elif self.email_mode == 'custom':
@@ -148,29 +292,50 @@ class Scheduler:
             if not self.email_custom_times:
                 # 如果没有设置自定义时间，默认每小时发送一次
                 logger.warning("未设置自定义发送时间，默认使用每小时整点")
-                schedule.every().hour.at(":00").do(self._send_email)
+                self._add_job(self._send_email, _hourly_at(0))
             else:
+                # 所有自定义时间合并为一个任务，重复的时间只发送一次
+                minutes = set()
                 for time_str in self.email_custom_times:
-                    # 检查时间格式是否正确
                     try:
-                        hour, minute = time_str.split(":")
-                        int(hour)
-                        int(minute)
-                        schedule.every().day.at(time_str).do(self._send_email)
+                        minutes.add(_parse_minute_of_day(time_str))
                         logger.info(f"已设置邮件发送任务，每天{time_str}执行")
                     except Exception as e:
                         logger.error(f"自定义时间格式错误: {time_str}, {str(e)}")
+                if minutes:
+                    self._add_job(self._send_email, _daily_at(sorted(minutes)))
+        
+        # 定时发送心跳，使两次邮件之间保持已登录的SMTP连接，发送时无需重新握手和登录
+        self._add_job(self._keep_alive, _every(SMTP_KEEPALIVE_INTERVAL))
         
         # 如果设置了截图后立即发送，则不需要额外的邮件发送任务
         if self.send_with_capture:
             logger.info("已设置截图后立即发送邮件模式，不创建单独的邮件发送任务")
         
-    def _run_scheduler(self):
-        """运行调度器循环"""
+    def _add_job(self, job, next_delay):
+        """
+        添加定时任务
+        
+        Args:
+            job (callable): 任务函数
+            next_delay (callable): 返回距下次执行秒数的函数
+        """
+        deadline = time.monotonic() + next_delay()
+        heapq.heappush(self._jobs, (deadline, next(self._job_seq), job, next_delay))
+        
+    def _run_scheduler(self, wake, run_immediate=True):
+        """
+        运行调度器循环，线程休眠到最近一个任务的执行时间，停止时被立即唤醒
+        
+        Args:
+            wake (threading.Event): 本次运行的停止事件
+            run_immediate (bool): 是否按配置立即执行一次任务，恢复运行时为False
+        """
         self._schedule_jobs()
+        jobs = self._jobs
         
         # 立即执行一次任务
-        if self.send_immediate:
+        if run_immediate and self.send_immediate:
             logger.info("立即执行一次截图任务")
             screenshots = self._take_screenshots()
             
@@ -181,26 +346,41 @@ class Scheduler:
         
         # 进入调度循环
         logger.info("调度器开始运行")
-        while self.is_running:
-            schedule.run_pending()
-            time.sleep(1)
+        while not wake.is_set():
+            # 执行所有已到期的任务，执行完成后按延迟函数重新安排
+            while jobs and jobs[0][0] <= time.monotonic() and not wake.is_set():
+                _, seq, job, next_delay = heapq.heappop(jobs)
+                try:
+                    job()
+                except Exception as e:
+                    logger.error(f"执行定时任务失败: {str(e)}")
+                heapq.heappush(jobs, (time.monotonic() + next_delay(), seq, job, next_delay))
+                
+            wake.wait(jobs[0][0] - time.monotonic() if jobs else None)
             
         logger.info("调度器已停止")
             
-    def start(self):
-        """启动调度器"""
+    def start(self, run_immediate=True):
+        """
+        启动调度器
+        
+        Args:
+            run_immediate (bool): 是否按配置立即执行一次任务
+        """
         if self.is_running:
             logger.warning("调度器已经在运行中")
             return
+            
+        # 上次停止时等待超时的线程可能仍在执行截图或发送任务，两个线程不能同时使用同一组截图和连接
+        self.wait_stopped()
 
         self.is_running = True
-        self.thread = threading.Thread(target=self._run_scheduler)
+        self._wake = threading.Event()
+        self.thread = threading.Thread(target=self._run_scheduler, args=(self._wake, run_immediate))
         self.thread.daemon = True
         self.thread.start()
 
         logger.info("调度器已启动")
-        # 移除主线程阻塞循环，避免卡死GUI
-        # 保持主线程运行的循环已删除
 
     def stop(self):
         """停止调度器"""
@@ -209,10 +389,27 @@ class Scheduler:
             return
             
         self.is_running = False
+        self._wake.set()
         if self.thread and self.thread.is_alive():
             self.thread.join(timeout=5)
             
         # 清空调度任务
-        schedule.clear()
+        self._jobs = []
+        
+        logger.info("调度器已停止")
+        
+    def wait_stopped(self):
+        """等待已停止的调度线程执行完当前任务并退出"""
+        if self.thread and self.thread.is_alive():
+            logger.info("等待上次运行中的任务完成")
+            self.thread.join()
+            
+    def pause(self):
+        """暂停调度器，保留未发送的截图和日志记录，可通过resume恢复"""
+        self.stop()
+        logger.info("调度器已暂停")
         
-        logger.info("调度器已停止")
\ No newline at end of file
+    def resume(self):
+        """恢复已暂停的调度器，不再重复执行立即任务，上次运行中的任务未完成时会等待其完成"""
+        self.start(run_immediate=False)
+        logger.info("调度器已恢复")
\ No newline at end of file
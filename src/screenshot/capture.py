@@ -7,14 +7,56 @@
 """
 
 import os
+import io
 import time
 import logging
-from datetime import datetime
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import PIL.ImageGrab
 from PIL import Image
 
+# mss直接返回原始BGRA像素，比ImageGrab开销更小，未安装时使用ImageGrab
+try:
+    import mss
+except ImportError:
+    mss = None
+
 logger = logging.getLogger(__name__)
 
+# 截图格式与PIL格式名不一致的映射
+_PIL_FORMATS = {'jpg': 'JPEG'}
+
+# 缓存的截图编码内容的总字节数上限，超出时丢弃最早的截图，发送时改为从磁盘读取
+_ENCODED_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# 连续截图中差异哈希相差的位数小于该值时视为画面未变化
+_DUPLICATE_HASH_DISTANCE = 3
+
+def _dhash(image):
+    """
+    计算图像的64位差异哈希(dHash)
+    
+    Args:
+        image (Image.Image): 图像
+        
+    Returns:
+        int: 哈希值
+    """
+    pixels = list(image.resize((9, 8), Image.BILINEAR).convert('L').getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            offset = row * 9 + col
+            value = (value << 1) | (pixels[offset] > pixels[offset + 1])
+    return value
+
+# mss实例持有的系统句柄不能跨线程使用，每个线程各自创建一个
+_mss_local = threading.local()
+
+# 连续截图时在后台编码保存，截图循环不必等待上一张写入磁盘
+_save_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="screenshot-save")
+
 class ScreenCapture:
     """屏幕截图类"""
     
@@ -27,10 +69,17 @@ class ScreenCapture:
             config (dict): 截图相关配置
         """
         self.screenshot_dir = screenshot_dir
-        self.format = config.get('format', 'png')
-        self.quality = config.get('quality', 90)
+        self.format = config.get('format', 'jpg')
+        self.quality = config.get('quality', 85)
+        self._pil_format = _PIL_FORMATS.get(self.format.lower(), self.format.upper())
         self.bbox = config.get('bbox', None)  # 截取区域，默认全屏
         
+        # 连续截图的编码内容，发送邮件时无需再从磁盘读取，清理截图时一并移除
+        # 发送持续失败时截图会不断积累，按总字节数限制缓存大小，保存线程和发送线程共用，需加锁
+        self._encoded_cache = OrderedDict()
+        self._encoded_cache_bytes = 0
+        self._encoded_cache_lock = threading.Lock()
+        
         # 确保截图目录存在
         os.makedirs(self.screenshot_dir, exist_ok=True)
         logger.info(f"截图模块初始化完成，截图将保存至: {self.screenshot_dir}")
@@ -44,25 +93,17 @@ class ScreenCapture:
         """
         try:
             # 捕获屏幕
-            screenshot = PIL.ImageGrab.grab(bbox=self.bbox)
-            
-            # 生成文件名
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"screenshot_{timestamp}.{self.format}"
-            filepath = os.path.join(self.screenshot_dir, filename)
-            
-            # 保存截图
-            screenshot.save(filepath, format=self.format.upper(), quality=self.quality)
-            logger.debug(f"截图已保存: {filepath}")
-            return filepath
-            
+            screenshot = self._grab()
         except Exception as e:
             logger.error(f"截图失败: {str(e)}")
             return None
+            
+        return self._save(screenshot, self._new_filepath())
     
     def capture_multi(self, count=3, interval=0.5):
         """
-        连续捕获多张屏幕截图
+        连续捕获多张屏幕截图，截图按固定节奏进行，保存在后台线程中完成，
+        与上一张相比画面未变化的截图不保存
         
         Args:
             count (int): 截图数量
@@ -71,15 +112,140 @@ class ScreenCapture:
         Returns:
             list: 保存的截图文件路径列表
         """
-        filepaths = []
+        futures = []
+        last_hash = None
+        start = time.perf_counter()
         for i in range(count):
-            filepath = self.capture()
-            if filepath:
-                filepaths.append(filepath)
-            if i < count - 1:
-                time.sleep(interval)
+            # 按起始时间计算每张截图的时刻，保存耗时不会累积到间隔中
+            delay = start + i * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+                
+            try:
+                screenshot = self._grab()
+            except Exception as e:
+                logger.error(f"截图失败: {str(e)}")
+                continue
+                
+            # 画面与上一张相同时跳过编码、保存和邮件附件
+            if count > 1:
+                screenshot_hash = _dhash(screenshot)
+                if last_hash is not None and bin(screenshot_hash ^ last_hash).count('1') < _DUPLICATE_HASH_DISTANCE:
+                    logger.debug(f"第{i + 1}张截图与上一张相同，已跳过")
+                    continue
+                last_hash = screenshot_hash
+                
+            filepath = self._new_filepath(i + 1)
+            futures.append(_save_pool.submit(self._save, screenshot, filepath, True))
         
-        return filepaths
+        # 等待所有截图保存完成
+        return [filepath for filepath in (future.result() for future in futures) if filepath]
+    
+    def _grab(self):
+        """
+        捕获屏幕
+        
+        Returns:
+            Image.Image: 截图
+        """
+        if mss is None:
+            return PIL.ImageGrab.grab(bbox=self.bbox)
+            
+        sct = getattr(_mss_local, 'sct', None)
+        if sct is None:
+            sct = _mss_local.sct = mss.mss()
+            
+        # 未指定区域时与ImageGrab一致，截取主显示器
+        raw = sct.grab(tuple(self.bbox) if self.bbox else sct.monitors[1])
+        return Image.frombytes("RGB", raw.size, raw.bgra, "raw", "BGRX")
+        
+    def _new_filepath(self, index=None):
+        """
+        生成截图文件路径，文件名精确到毫秒，连续截图时附加序号
+        
+        Args:
+            index (int, optional): 连续截图中的序号
+            
+        Returns:
+            str: 截图文件路径
+        """
+        now = time.time()
+        timestamp = f"{time.strftime('%Y%m%d_%H%M%S', time.localtime(now))}_{int(now * 1000) % 1000:03d}"
+        if index is not None:
+            filename = f"screenshot_{timestamp}_{index}.{self.format}"
+        else:
+            filename = f"screenshot_{timestamp}.{self.format}"
+        return os.path.join(self.screenshot_dir, filename)
+    
+    def _save(self, screenshot, filepath, keep_bytes=False):
+        """
+        保存截图
+        
+        Args:
+            screenshot (Image.Image): 截图
+            filepath (str): 保存路径
+            keep_bytes (bool): 是否缓存编码内容供发送邮件使用，缓存在cleanup_screenshots、discard_bytes或超出上限时释放
+            
+        Returns:
+            str: 保存的截图文件路径，失败时返回None
+        """
+        try:
+            buf = io.BytesIO()
+            screenshot.save(buf, format=self._pil_format, quality=self.quality)
+            data = buf.getvalue()
+            with open(filepath, 'wb') as f:
+                f.write(data)
+            if keep_bytes:
+                self._cache_bytes(filepath, data)
+            logger.debug(f"截图已保存: {filepath}")
+            return filepath
+        except Exception as e:
+            logger.error(f"保存截图失败: {str(e)}")
+            return None
+    
+    def _cache_bytes(self, path, data):
+        """
+        缓存截图的编码内容，超出总字节数上限时丢弃最早缓存的内容
+        
+        Args:
+            path (str): 截图文件路径
+            data (bytes): 截图内容
+        """
+        with self._encoded_cache_lock:
+            previous = self._encoded_cache.pop(path, None)
+            if previous is not None:
+                self._encoded_cache_bytes -= len(previous)
+            self._encoded_cache[path] = data
+            self._encoded_cache_bytes += len(data)
+            while self._encoded_cache_bytes > _ENCODED_CACHE_MAX_BYTES:
+                _, evicted = self._encoded_cache.popitem(last=False)
+                self._encoded_cache_bytes -= len(evicted)
+                
+    def get_bytes(self, path):
+        """
+        获取截图的编码内容
+        
+        Args:
+            path (str): 截图文件路径
+            
+        Returns:
+            bytes: 截图内容，不在缓存中时返回None，由调用方从磁盘读取截图文件
+        """
+        with self._encoded_cache_lock:
+            return self._encoded_cache.get(path)
+        
+    def discard_bytes(self, screenshot_paths):
+        """
+        释放截图的缓存内容，截图文件保留在磁盘上
+        
+        Args:
+            screenshot_paths (list): 截图文件路径列表
+        """
+        with self._encoded_cache_lock:
+            for path in screenshot_paths:
+                data = self._encoded_cache.pop(path, None)
+                if data is not None:
+                    self._encoded_cache_bytes -= len(data)
     
     def cleanup_screenshots(self, screenshot_paths):
         """
@@ -91,13 +257,17 @@ class ScreenCapture:
         if not screenshot_paths:
             return
             
+        self.discard_bytes(screenshot_paths)
+        
         count = 0
         for path in screenshot_paths:
             try:
-                if os.path.exists(path):
-                    os.remove(path)
-                    count += 1
-                    logger.debug(f"已删除截图: {path}")
+                # 直接删除，文件不存在时忽略，无需先检查
+                os.remove(path)
+                count += 1
+                logger.debug(f"已删除截图: {path}")
+            except FileNotFoundError:
+                pass
             except Exception as e:
                 logger.error(f"删除截图失败: {path}, 错误: {str(e)}")
                 
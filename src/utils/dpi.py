@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+DPI工具模块
+设置进程的DPI感知模式
+"""
+
+import sys
+import logging
+
+logger = logging.getLogger(__name__)
+
+def enable_dpi_awareness():
+    """
+    在Windows上声明进程支持按显示器DPI缩放，截图直接获取物理分辨率的画面，
+    不经过系统的缩放处理。已由Qt等设置过时调用不会产生影响
+    
+    会改变整个进程的DPI模式，只在程序启动时调用一次
+    """
+    if sys.platform != 'win32':
+        return
+        
+    import ctypes
+    try:
+        # PROCESS_PER_MONITOR_DPI_AWARE，Windows 8.1及以上
+        ctypes.windll.shcore.SetProcessDpiAwareness(2)
+    except (AttributeError, OSError):
+        try:
+            # 更早的系统只支持系统级DPI感知
+            ctypes.windll.user32.SetProcessDPIAware()
+        except (AttributeError, OSError) as e:
+            logger.warning(f"设置DPI感知失败: {str(e)}")
\ No newline at end of file
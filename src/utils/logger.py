@@ -7,10 +7,26 @@
 """
 
 import os
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from datetime import datetime
 
+# 当前正在写入的日志文件路径，由setup_logger设置
+_active_log_file = None
+
+# 在后台线程中执行控制台和文件输出的监听器，由setup_logger设置
+_listener = None
+
+@atexit.register
+def _stop_listener():
+    """进程退出时停止后台日志线程，写出队列中剩余的日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 def setup_logger(log_dir, log_level=logging.INFO):
     """
     设置应用日志系统
@@ -23,10 +39,12 @@ def setup_logger(log_dir, log_level=logging.INFO):
         logging.Logger: 配置好的日志记录器
     """
     # 确保日志目录存在
+    global _active_log_file, _listener
     os.makedirs(log_dir, exist_ok=True)
     
     # 创建日志文件名
     log_file = os.path.join(log_dir, f"screenmailer_{datetime.now().strftime('%Y%m%d')}.log")
+    _active_log_file = log_file
     
     # 设置根日志记录器
     logger = logging.getLogger()
@@ -35,6 +53,7 @@ def setup_logger(log_dir, log_level=logging.INFO):
     # 清空已有的handlers，避免重复
     if logger.handlers:
         logger.handlers.clear()
+    _stop_listener()
     
     # 创建控制台处理器
     console_handler = logging.StreamHandler()
@@ -53,9 +72,13 @@ def setup_logger(log_dir, log_level=logging.INFO):
     file_format = logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(filename)s:%(lineno)d - %(message)s')
     file_handler.setFormatter(file_format)
     
+    # 日志调用只把记录放入队列，控制台和文件的写入（包括日志轮转）在后台线程中完成
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+    
     # 添加处理器到根日志记录器
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    logger.addHandler(QueueHandler(log_queue))
     
     logger.info("日志系统初始化完成")
     return logger
@@ -70,4 +93,13 @@ def get_logger(name):
     Returns:
         logging.Logger: 指定名称的日志记录器
     """
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
+
+def get_active_log_file():
+    """
+    获取当前正在写入的日志文件路径
+    
+    Returns:
+        str: 日志文件路径，未初始化日志系统时返回None
+    """
+    return _active_log_file
\ No newline at end of file
@@ -0,0 +1,86 @@
+# -*- mode: python ; coding: utf-8 -*-
+
+"""
+ScreenMailer PyInstaller spec文件
+由build_exe.py调用，打包模式通过环境变量SCREENMAILER_PACK(onedir/onefile)选择
+"""
+
+import os
+import sys
+
+# 与build_exe.py共用隐式导入和排除模块列表
+sys.path.insert(0, SPECPATH)
+from build_exe import HIDDEN_IMPORTS, EXCLUDED_MODULES
+
+pack_mode = os.environ.get('SCREENMAILER_PACK', 'onedir')
+
+tools_dir = os.path.dirname(SPECPATH)
+project_root = os.path.dirname(tools_dir)
+src_dir = os.path.join(project_root, 'src')
+gui_file = os.path.join(src_dir, 'gui', 'screenmailer_gui.py')
+
+icon_path = os.path.join(tools_dir, 'assets', 'icon.ico')
+if not os.path.exists(icon_path):
+    icon_path = None
+
+a = Analysis(
+    [gui_file],
+    pathex=[],
+    binaries=[],
+    datas=[(src_dir, 'src')],
+    hiddenimports=list(HIDDEN_IMPORTS),
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=list(EXCLUDED_MODULES),
+    # 目录模式下将纯Python模块以.pyc文件形式存放，启动时无需解压PYZ归档
+    noarchive=(pack_mode == 'onedir'),
+    # 以-OO级别编译字节码，去除docstring和assert
+    optimize=2,
+)
+
+# 去除Tcl/Tk相关的二进制文件，程序界面基于PyQt5，不需要Tk
+a.binaries = [b for b in a.binaries if not os.path.basename(b[0]).lower().startswith(('tcl', 'tk', '_tkinter'))]
+
+pyz = PYZ(a.pure)
+
+if pack_mode == 'onefile':
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.datas,
+        [],
+        name='ScreenMailer',
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        upx=False,
+        upx_exclude=[],
+        runtime_tmpdir=None,
+        console=False,
+        icon=icon_path,
+    )
+else:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        name='ScreenMailer',
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        upx=False,
+        console=False,
+        icon=icon_path,
+    )
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.datas,
+        strip=False,
+        upx=False,
+        upx_exclude=[],
+        name='ScreenMailer',
+    )
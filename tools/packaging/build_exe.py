@@ -8,11 +8,283 @@ ScreenMailer打包脚本
 
 import os
 import sys
+import json
 import shutil
-import PyInstaller.__main__
+import hashlib
+import platform
+import subprocess
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import version, PackageNotFoundError
 
-def build_exe():
-    """构建可执行文件"""
+# 需要检测的依赖库：(包名, pip安装名)
+REQUIRED_PACKAGES = (
+    ('PyQt5', 'PyQt5'),
+    ('Pillow', 'Pillow'),
+    ('PyYAML', 'pyyaml'),
+)
+
+# 需要显式声明的隐式导入模块
+HIDDEN_IMPORTS = (
+    'PIL', 'PIL.ImageGrab', 'PIL.Image', 'Pillow',
+    # 标准库模块
+    'smtplib', 'logging', 'logging.handlers', 'datetime', 'yaml', 'platform', 'threading',
+)
+
+# 打包时排除的模块（PyInstaller会贪婪地收集环境中存在的可选依赖）
+EXCLUDED_MODULES = (
+    'tkinter', 'matplotlib', 'numpy', 'scipy',
+    'PyQt6', 'PySide2', 'PySide6',
+    'IPython', 'pytest', 'unittest', 'pydoc',
+    'distutils', 'setuptools', 'pip', 'wheel', 'lib2to3',
+)
+
+@lru_cache(maxsize=None)
+def _file_exists(path):
+    """检查构建输入文件是否存在，同一次运行中结果会被缓存"""
+    return os.path.exists(path)
+
+def _build_args(gui_file, src_dir, icon_path, pack_mode, work_dir, dist_dir, spec_path):
+    """
+    生成PyInstaller参数
+    
+    参数顺序固定，便于作为增量构建哈希的输入
+    
+    Args:
+        gui_file (str): 主程序文件路径
+        src_dir (str): 源代码目录
+        icon_path (str): 图标路径，为None时使用默认图标
+        pack_mode (str): 打包模式，onedir或onefile
+        work_dir (str): PyInstaller工作目录
+        dist_dir (str): 输出目录
+        spec_path (str): spec文件路径，存在时使用spec文件构建
+        
+    Returns:
+        tuple: PyInstaller参数
+    """
+    if _file_exists(spec_path):
+        return (spec_path, '--noconfirm', f'--workpath={work_dir}', f'--distpath={dist_dir}')
+    
+    args = [
+        gui_file,              # 主程序文件（使用绝对路径）
+        '--name=ScreenMailer',  # 生成的可执行文件名称
+        f'--{pack_mode}',       # 打包模式
+        '--windowed',           # 使用Windows子系统，不显示控制台窗口
+        '--noconfirm',          # 不询问确认
+        f'--add-data={src_dir};src',  # 使用绝对路径添加源代码目录
+        '--noupx',              # 不使用UPX压缩，避免启动时解压及打包时探测UPX
+        '--optimize=2',         # 以-OO级别编译字节码，去除docstring和assert
+    ]
+    
+    # 目录模式下将纯Python模块以.pyc文件形式存放，启动时无需解压PYZ归档
+    if pack_mode == 'onedir':
+        args.append('--noarchive')
+    
+    # 添加隐式导入的模块
+    args.extend(f'--hidden-import={module}' for module in HIDDEN_IMPORTS)
+    
+    # 排除程序用不到的模块，缩小分析范围和打包体积
+    # 注意：GUI基于PyQt5，不能排除PyQt5
+    args.extend(f'--exclude-module={module}' for module in EXCLUDED_MODULES)
+    
+    # 如果有图标文件，添加图标
+    if icon_path:
+        args.append(f'--icon={icon_path}')
+    
+    # 命令行模式生成的spec文件放在工作目录中，避免覆盖仓库中的spec文件
+    args += [f'--specpath={work_dir}', f'--workpath={work_dir}', f'--distpath={dist_dir}']
+    return tuple(args)
+
+def get_build_cache_dir(current_dir):
+    """
+    获取持久化的PyInstaller工作目录
+    
+    按Python版本区分，使分析缓存在多次构建、多个检出之间得以复用
+    
+    Args:
+        current_dir (str): 打包脚本所在目录，LOCALAPPDATA不存在时使用
+        
+    Returns:
+        str: 工作目录路径
+    """
+    cache_root = os.path.join(
+        os.environ.get('LOCALAPPDATA', current_dir),
+        'ScreenMailer',
+        'pyi-cache',
+        f'py{sys.version_info.major}{sys.version_info.minor}'
+    )
+    os.makedirs(cache_root, exist_ok=True)
+    return cache_root
+
+def print_build_cache_location(work_dir):
+    """打印增量构建时复用的PyInstaller工作目录"""
+    app_work_dir = os.path.join(work_dir, 'ScreenMailer')
+    if os.path.exists(app_work_dir):
+        print(f"增量构建，复用工作目录: {app_work_dir}")
+    else:
+        print(f"未找到已有工作目录，将进行全量构建: {app_work_dir}")
+
+def package_versions(packages):
+    """
+    读取已安装包的版本
+    
+    Args:
+        packages (iterable): 包名
+        
+    Returns:
+        list: "包名==版本"形式的字符串，未安装的包版本为空
+    """
+    versions = []
+    for package in packages:
+        try:
+            versions.append(f"{package}=={version(package)}")
+        except PackageNotFoundError:
+            versions.append(f"{package}==")
+    return versions
+
+def compute_build_hash(src_dir, pyinstaller_args, extra_files=()):
+    """
+    计算本次构建输入的内容哈希
+    
+    包含src目录下所有Python源文件、额外文件（如spec文件、图标）、PyInstaller参数
+    以及PyInstaller和依赖库的版本，任意一项变化都会改变哈希值
+    
+    Args:
+        src_dir (str): 源代码目录
+        pyinstaller_args (list): PyInstaller参数列表
+        extra_files (tuple): 需要一并计入哈希的其他文件
+        
+    Returns:
+        str: 十六进制哈希值
+    """
+    paths = []
+    for root, dirs, files in os.walk(src_dir):
+        dirs.sort()
+        paths.extend(os.path.join(root, name) for name in sorted(files) if name.endswith('.py'))
+    paths.extend(extra_files)
+    
+    digest = hashlib.blake2b()
+    for path in paths:
+        digest.update(os.path.relpath(path, src_dir).encode('utf-8'))
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    digest.update(json.dumps(pyinstaller_args).encode('utf-8'))
+    # 升级依赖库或PyInstaller后打包出的程序不同，需要重新构建
+    packages = ['pyinstaller'] + [package for package, _ in REQUIRED_PACKAGES]
+    digest.update(json.dumps(package_versions(packages)).encode('utf-8'))
+    return digest.hexdigest()
+
+def run_pyinstaller(pyinstaller_args, cwd):
+    """
+    以子进程方式运行PyInstaller，并实时输出其日志
+    
+    Args:
+        pyinstaller_args (list): PyInstaller参数列表
+        cwd (str): 子进程工作目录
+        
+    Returns:
+        bool: PyInstaller正常退出返回True，否则返回False
+    """
+    cmd = [sys.executable, '-m', 'PyInstaller', *pyinstaller_args]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, cwd=cwd, bufsize=1)
+    for line in proc.stdout:
+        print(line, end='')
+    return proc.wait() == 0
+
+def write_cache_key(work_dir, project_root):
+    """
+    写入构建缓存键，供CI缓存工作目录时使用
+    
+    缓存键由Python版本、PyInstaller版本和requirements.txt内容共同决定
+    
+    Args:
+        work_dir (str): PyInstaller工作目录
+        project_root (str): 项目根目录
+        
+    Returns:
+        str: 缓存键文件路径
+    """
+    key = hashlib.sha256()
+    key.update(platform.python_version().encode('utf-8'))
+    key.update(package_versions(['pyinstaller'])[0].encode('utf-8'))
+    requirements_path = os.path.join(project_root, 'requirements.txt')
+    if os.path.exists(requirements_path):
+        with open(requirements_path, 'rb') as f:
+            key.update(f.read())
+    
+    cache_key_path = os.path.join(work_dir, '.cache_key')
+    with open(cache_key_path, 'w', encoding='utf-8') as f:
+        f.write(key.hexdigest())
+    return cache_key_path
+
+def link_or_copy(src, dst):
+    """
+    以硬链接方式发布文件，跨卷等无法创建硬链接时退回到复制
+    
+    Args:
+        src (str): 源文件路径
+        dst (str): 目标文件路径
+    """
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+def link_tree(src_dir, dst_dir):
+    """
+    以硬链接方式发布整个目录
+    
+    先清空目标目录，旧版本中已不存在的DLL、.pyd和.pyc文件不会残留在发布目录中被程序加载
+    
+    Args:
+        src_dir (str): 源目录
+        dst_dir (str): 目标目录
+    """
+    shutil.rmtree(dst_dir, ignore_errors=True)
+    for root, dirs, files in os.walk(src_dir):
+        target_root = os.path.join(dst_dir, os.path.relpath(root, src_dir))
+        os.makedirs(target_root, exist_ok=True)
+        for name in files:
+            link_or_copy(os.path.join(root, name), os.path.join(target_root, name))
+
+def probe_package(package, install_name):
+    """
+    检测单个依赖库的版本
+    
+    Args:
+        package (str): 包名
+        install_name (str): pip安装名
+        
+    Returns:
+        str: 检测结果信息
+    """
+    try:
+        return f"{package}已安装，版本: {version(package)}"
+    except PackageNotFoundError:
+        return f"警告: 未检测到{package}库，请先运行 'pip install {install_name}'"
+
+def check_dependencies():
+    """
+    检测所需库是否已安装
+    
+    通过importlib.metadata读取包的版本信息，无需真正导入这些包；
+    各个包的检测互不依赖，在线程池中并行执行
+    """
+    print("检测所需库是否已安装...")
+    with ThreadPoolExecutor(max_workers=len(REQUIRED_PACKAGES)) as executor:
+        for message in executor.map(lambda item: probe_package(*item), REQUIRED_PACKAGES):
+            print(message)
+
+def build_exe(verbose=False):
+    """
+    构建可执行文件
+    
+    Args:
+        verbose (bool): 是否输出依赖库版本等详细信息
+    """
     print("开始构建ScreenMailer可执行文件...")
     
     # 获取当前脚本所在目录
@@ -23,7 +295,7 @@ def build_exe():
     # 获取图标路径
     assets_dir = os.path.join(tools_dir, "assets")
     icon_path = os.path.join(assets_dir, "icon.ico")
-    if not os.path.exists(icon_path):
+    if not _file_exists(icon_path):
         print("警告: 图标文件不存在，将使用默认图标")
         icon_path = None
     
@@ -34,103 +306,94 @@ def build_exe():
     gui_dir = os.path.join(src_dir, 'gui')
     gui_file = os.path.join(gui_dir, 'screenmailer_gui.py')
     
-    if not os.path.exists(gui_file):
+    if not _file_exists(gui_file):
         print(f"错误: 主程序文件不存在 {gui_file}")
         return False
     
+    # 打包模式：默认onedir，避免onefile每次启动都解压到临时目录
+    # 可通过环境变量SCREENMAILER_PACK=onefile切换回单文件模式
+    pack_mode = os.environ.get('SCREENMAILER_PACK', 'onedir')
+    if pack_mode not in ('onedir', 'onefile'):
+        print(f"错误: 不支持的打包模式 {pack_mode}，可选值为 onedir 或 onefile")
+        return False
+    
+    # 使用持久化的工作目录，所有路径均以绝对路径传入，无需切换进程工作目录
+    work_dir = get_build_cache_dir(current_dir)
+    dist_dir = os.path.join(project_root, "dist")
+    
+    # 存在spec文件时优先使用spec文件构建，打包模式等选项由spec文件读取
+    spec_path = os.path.join(current_dir, 'ScreenMailer.spec')
+    if _file_exists(spec_path):
+        print(f"使用spec文件构建: {spec_path}")
+    
     # 定义打包参数
-    pyinstaller_args = [
-        gui_file,              # 主程序文件（使用绝对路径）
-        '--name=ScreenMailer',  # 生成的可执行文件名称
-        '--onefile',            # 打包成单个可执行文件
-        '--windowed',           # 使用Windows子系统，不显示控制台窗口
-        '--clean',              # 在构建之前清除临时文件
-        '--noconfirm',          # 不询问确认
-        f'--add-data={src_dir};src',  # 使用绝对路径添加源代码目录
-        '--hidden-import=PIL',  # 添加PIL模块作为隐式导入
-        '--hidden-import=PIL._imagingtk',
-        '--hidden-import=PIL._tkinter_finder',
-        '--hidden-import=PIL.ImageGrab',
-        '--hidden-import=PIL.Image',
-        '--hidden-import=Pillow',
-        # 添加标准库模块作为隐式导入
-        '--hidden-import=smtplib',
-        '--hidden-import=email',
-        '--hidden-import=email.mime.multipart',
-        '--hidden-import=email.mime.text',
-        '--hidden-import=email.mime.image',
-        '--hidden-import=logging',
-        '--hidden-import=logging.handlers',
-        '--hidden-import=datetime',
-        '--hidden-import=yaml',
-        '--hidden-import=platform',
-        '--hidden-import=schedule',
-        '--hidden-import=threading',
-    ]
+    pyinstaller_args = list(_build_args(gui_file, src_dir, icon_path, pack_mode, work_dir, dist_dir, spec_path))
     
-    # 如果有图标文件，添加图标
-    if icon_path:
-        pyinstaller_args.append(f'--icon={icon_path}')
+    # 默认保留工作目录以便增量构建，设置SCREENMAILER_CLEAN_BUILD=1可强制全量构建
+    if os.environ.get('SCREENMAILER_CLEAN_BUILD'):
+        pyinstaller_args.append('--clean')
+    else:
+        print_build_cache_location(work_dir)
     
-    # 设置工作目录
-    os.chdir(project_root)  # 改为工作在项目根目录
+    # 仅在详细模式下检测依赖版本
+    if verbose:
+        check_dependencies()
     
-    print("检测所需库是否已安装...")
-    try:
-        import PIL
-        print(f"Pillow已安装，版本: {PIL.__version__}")
-    except ImportError:
-        print("警告: 未检测到Pillow(PIL)库，请先运行 'pip install Pillow'")
-        
-    try:
-        import yaml
-        print(f"PyYAML已安装，版本: {yaml.__version__}")
-    except ImportError:
-        print("警告: 未检测到PyYAML库，请先运行 'pip install pyyaml'")
+    # 构建产物路径
+    if pack_mode == 'onedir':
+        exe_path = os.path.join(dist_dir, "ScreenMailer", "ScreenMailer.exe")
+    else:
+        exe_path = os.path.join(dist_dir, "ScreenMailer.exe")
+    
+    # 源码、参数和依赖版本均未变化且产物存在时跳过PyInstaller
+    # spec文件从本脚本导入隐式导入和排除模块列表，使用spec文件时本脚本也计入哈希
+    extra_files = [spec_path, os.path.abspath(__file__)] if _file_exists(spec_path) else []
+    # 图标只以路径出现在参数或spec文件中，重新生成图标后需要按内容判断
+    if icon_path:
+        extra_files.append(icon_path)
+    build_hash = compute_build_hash(src_dir, pyinstaller_args + [pack_mode], extra_files)
+    stamp_path = os.path.join(work_dir, '.last_build_hash')
+    up_to_date = False
+    if not os.environ.get('SCREENMAILER_CLEAN_BUILD') and os.path.exists(stamp_path) and os.path.exists(exe_path):
+        with open(stamp_path, 'r', encoding='utf-8') as f:
+            up_to_date = f.read() == build_hash
+    
+    if up_to_date:
+        print("源代码、打包参数和依赖版本均无变化，跳过PyInstaller")
+    else:
+        # 在子进程中调用PyInstaller，避免将其依赖加载到当前进程
+        print("正在调用PyInstaller打包程序...")
+        if not run_pyinstaller(pyinstaller_args, current_dir):
+            print("PyInstaller执行失败，请检查错误信息")
+            return False
         
-    try:
-        import schedule
-        print(f"schedule已安装，版本: {schedule.__version__}")
-    except (ImportError, AttributeError):
-        print("警告: 未检测到schedule库，请先运行 'pip install schedule'")
-    
-    # 创建一个临时的__init__.py文件，以帮助PyInstaller识别自定义包
-    email_init_path = os.path.join(src_dir, 'email', '__init__.py')
-    if not os.path.exists(email_init_path):
-        try:
-            os.makedirs(os.path.dirname(email_init_path), exist_ok=True)
-            open(email_init_path, 'w').close()
-            print(f"创建了临时文件: {email_init_path}")
-        except Exception as e:
-            print(f"无法创建临时文件: {e}")
-    
-    # 调用PyInstaller
-    print("正在调用PyInstaller打包程序...")
-    PyInstaller.__main__.run(pyinstaller_args)
-    
-    # 如果创建了临时文件，尝试删除
-    if os.path.exists(email_init_path) and os.path.getsize(email_init_path) == 0:
-        try:
-            os.remove(email_init_path)
-            print(f"删除了临时文件: {email_init_path}")
-        except:
-            pass
+        # 记录本次构建的哈希和CI缓存键
+        if os.path.exists(exe_path):
+            with open(stamp_path, 'w', encoding='utf-8') as f:
+                f.write(build_hash)
+            write_cache_key(work_dir, project_root)
     
     # 构建完成后检查
-    dist_dir = os.path.join(project_root, "dist")
-    exe_path = os.path.join(dist_dir, "ScreenMailer.exe")
-    
     if os.path.exists(exe_path):
         print(f"打包成功! 可执行文件路径: {exe_path}")
         
         # 创建发布目录
-        # release_dir = os.path.join(project_root, "release")
-        # os.makedirs(release_dir, exist_ok=True)
+        release_dir = os.path.join(project_root, "release")
+        os.makedirs(release_dir, exist_ok=True)
         
-        # 将可执行文件复制到发布目录
-        # release_exe = os.path.join(release_dir, "ScreenMailer.exe")
-        # shutil.copy2(exe_path, release_exe)
-        # print(f"已将可执行文件复制到发布目录: {release_exe}")
+        if pack_mode == 'onedir':
+            # 将程序目录发布到发布目录（硬链接），并打包为zip便于分发
+            release_app_dir = os.path.join(release_dir, "ScreenMailer")
+            link_tree(os.path.join(dist_dir, "ScreenMailer"), release_app_dir)
+            print(f"已将程序目录发布到: {release_app_dir}")
+            
+            archive_path = shutil.make_archive(os.path.join(release_dir, "ScreenMailer"), 'zip', dist_dir, "ScreenMailer")
+            print(f"已生成发布压缩包: {archive_path}")
+        else:
+            # 将可执行文件发布到发布目录（硬链接）
+            release_exe = os.path.join(release_dir, "ScreenMailer.exe")
+            link_or_copy(exe_path, release_exe)
+            print(f"已将可执行文件发布到: {release_exe}")
         
         return True
     else:
@@ -139,7 +402,8 @@ def build_exe():
 
 if __name__ == "__main__":
     try:
-        success = build_exe()
+        verbose = '--verbose' in sys.argv or bool(os.environ.get('SCREENMAILER_BUILD_VERBOSE'))
+        success = build_exe(verbose=verbose)
         if success:
             print("ScreenMailer打包过程成功完成!")
         else:
@@ -6,49 +6,250 @@ ScreenMailer图标生成脚本 - 高分辨率版
 创建一个1024x1024分辨率的高质量应用程序图标
 """
 
+import io
 import os
-from PIL import Image, ImageDraw, ImageFilter, ImageEnhance
+import sys
+import math
+import struct
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import PIL
+from PIL import Image, ImageDraw, ImageFilter, ImageStat
 
-def create_icon():
-    """创建高分辨率图标"""
+def paste_radial_gradient(image, center, radius, inner_color, outer_color):
+    """
+    在图像上绘制填充径向渐变的圆形，颜色从圆心线性过渡到边缘
+    
+    一次生成整个渐变，代替逐个半径绘制相互覆盖的同心圆
+    
+    Args:
+        image (Image.Image): 目标RGBA图像
+        center (tuple): 圆心坐标
+        radius (int): 半径
+        inner_color (tuple): 圆心处的RGB颜色
+        outer_color (tuple): 边缘处的RGB颜色
+    """
+    diameter = 2 * radius + 1
+    
+    # radial_gradient生成256x256的距离场，值与到中心的距离成正比，在角落(距离128*sqrt(2))处为255
+    distance = Image.radial_gradient('L').resize((diameter, diameter), Image.Resampling.BILINEAR)
+    edge_value = 255 * (256 / diameter) * radius / (128 * math.sqrt(2))
+    
+    # 按距离查表得到各通道颜色
+    bands = [
+        distance.point([int(inner + (outer - inner) * min(v / edge_value, 1)) for v in range(256)])
+        for inner, outer in zip(inner_color, outer_color)
+    ]
+    gradient = Image.merge('RGB', bands)
+    
+    # 只保留圆形区域
+    mask = Image.new('L', (diameter, diameter), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, diameter - 1, diameter - 1), fill=255)
+    
+    image.paste(gradient, (center[0] - radius, center[1] - radius), mask)
+
+# 大半径模糊先缩小到1/4处理再放大回原尺寸，模糊本身会抹平缩放引入的误差
+BLUR_DOWNSCALE = 4
+# 缩小后的模糊半径不小于此值时才缩小处理，半径太小时缩放误差会显现
+MIN_DOWNSCALED_BLUR_RADIUS = 4
+
+def composite_blurred_under(image, shape, bbox, blur_radius, background, **kwargs):
+    """
+    在图像下方合成一个模糊的形状(外发光、阴影)
+    
+    图层只按形状及其模糊范围分配，合成也只处理这个区域，范围外的图像保持不变
+    
+    Args:
+        image (Image.Image): 目标RGBA图像，原地修改
+        shape (str): ImageDraw的绘制方法名，如'ellipse'、'rounded_rectangle'
+        bbox (tuple): 形状的边界框
+        blur_radius (int): 高斯模糊半径
+        background (tuple): 图层的透明底色
+        **kwargs: 传给绘制方法的其他参数
+    """
+    # 高斯模糊的影响范围约为三倍半径，超出画布的部分裁掉，与在整个画布上处理的结果一致
+    pad = 3 * blur_radius
+    left = max(bbox[0] - pad, 0)
+    top = max(bbox[1] - pad, 0)
+    right = min(bbox[2] + pad + 1, image.width)
+    bottom = min(bbox[3] + pad + 1, image.height)
+    
+    layer = Image.new('RGBA', (right - left, bottom - top), background)
+    getattr(ImageDraw.Draw(layer), shape)(
+        (bbox[0] - left, bbox[1] - top, bbox[2] - left, bbox[3] - top), **kwargs)
+    if blur_radius >= BLUR_DOWNSCALE * MIN_DOWNSCALED_BLUR_RADIUS:
+        # reduce按块取平均并保留不足一块的边缘，放大时只取对应原尺寸的部分
+        small = layer.reduce(BLUR_DOWNSCALE).filter(
+            ImageFilter.GaussianBlur(radius=blur_radius / BLUR_DOWNSCALE))
+        layer = small.resize(layer.size, Image.Resampling.BILINEAR,
+                             box=(0, 0, layer.width / BLUR_DOWNSCALE, layer.height / BLUR_DOWNSCALE))
+    else:
+        layer = layer.filter(ImageFilter.GaussianBlur(radius=blur_radius))
+    
+    # 只合成模糊后不透明度不为0的区域
+    opaque_bbox = layer.getbbox()
+    if opaque_bbox is None:
+        return
+    layer = layer.crop(opaque_bbox)
+    left += opaque_bbox[0]
+    top += opaque_bbox[1]
+    
+    region = (left, top, left + layer.width, top + layer.height)
+    image.paste(Image.alpha_composite(layer, image.crop(region)), region[:2])
+
+def enhance_contrast_brightness(image, contrast, brightness):
+    """
+    依次调整图像的对比度和亮度，结果与ImageEnhance.Contrast、ImageEnhance.Brightness相同
+    
+    两次调整都是逐像素的线性变换，合并成一张查找表后只需处理一遍图像，alpha通道保持不变
+    
+    Args:
+        image (Image.Image): RGBA图像
+        contrast (float): 对比度系数
+        brightness (float): 亮度系数
+        
+    Returns:
+        Image.Image: 调整后的图像
+    """
+    # 与ImageEnhance.Contrast一致，以灰度图的平均值为对比度调整的中心
+    mean = int(ImageStat.Stat(image.convert('L')).mean[0] + 0.5)
+    
+    def clip(value):
+        # 与Pillow混合图像时的处理一致，超出范围的截断，范围内的向下取整
+        return 0 if value <= 0 else 255 if value >= 255 else int(value)
+    
+    rgb_lut = [clip(brightness * clip(mean + contrast * (v - mean))) for v in range(256)]
+    return image.point(rgb_lut * 3 + list(range(256)))
+
+def _source_digest():
+    """
+    计算图标生成脚本内容与Pillow版本的摘要，两者不变时生成的图标也不变
+    
+    Returns:
+        str: 十六进制摘要
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(os.path.abspath(__file__), 'rb') as f:
+        digest.update(f.read())
+    digest.update(PIL.__version__.encode('ascii'))
+    return digest.hexdigest()
+
+def encode_png(image):
+    """
+    将图像编码为PNG数据
+    
+    Args:
+        image (PIL.Image.Image): 要编码的图像
+        
+    Returns:
+        bytes: PNG数据
+    """
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+def build_ico(icons):
+    """
+    将各尺寸图标组装为ICO文件，每个尺寸以PNG格式嵌入
+    
+    ICO文件由6字节的ICONDIR头、每个尺寸16字节的ICONDIRENTRY目录项和依次拼接的图像数据组成，
+    每个尺寸只编码一次PNG，不经过Pillow的ICO插件再复制和检查各尺寸
+    
+    Args:
+        icons (list): 各尺寸的RGBA图标，边长不超过256
+        
+    Returns:
+        bytes: ICO文件内容
+    """
+    payloads = [encode_png(icon) for icon in icons]
+    
+    # ICONDIR: 保留字段、类型(1为图标)、图像数量
+    header = [struct.pack('<HHH', 0, 1, len(icons))]
+    offset = 6 + 16 * len(icons)
+    for icon, payload in zip(icons, payloads):
+        # ICONDIRENTRY: 宽、高(256记为0)、调色板颜色数、保留字段、色彩平面数、每像素位数、数据长度、数据偏移
+        header.append(struct.pack('<BBBBHHII', icon.width % 256, icon.height % 256, 0, 0,
+                                  1, 32, len(payload), offset))
+        offset += len(payload)
+    return b''.join(header + payloads)
+
+def _write_atomic(path, data):
+    """
+    将数据一次写入同目录下的临时文件，再替换目标文件
+    并行运行的打包脚本不会读到写了一半的图标文件
+    
+    Args:
+        path (str): 目标文件路径
+        data (bytes): 文件内容
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def create_icon(force=False):
+    """
+    创建高分辨率图标
+    
+    Args:
+        force (bool): 为True时忽略已生成的图标，总是重新绘制
+        
+    Returns:
+        str: ICO文件路径
+    """
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    tools_dir = os.path.dirname(current_dir)
+    assets_dir = os.path.join(tools_dir, "assets")
+    png_path = os.path.join(assets_dir, "icon_1024.png")
+    icon_path = os.path.join(assets_dir, "icon.ico")
+    # 记录生成图标时脚本摘要的文件，用内容摘要而不是修改时间判断，git检出会改变文件的修改时间
+    hash_path = os.path.join(assets_dir, ".icon.hash")
+    
+    source_digest = _source_digest()
+    if not force and os.path.exists(png_path) and os.path.exists(icon_path):
+        try:
+            with open(hash_path, 'r', encoding='ascii') as f:
+                if f.read().strip() == source_digest:
+                    print(f"图标已是最新，跳过生成: {icon_path}")
+                    return icon_path
+        except OSError:
+            pass
+    
     print("正在创建ScreenMailer高分辨率图标...")
     
-    # 图标尺寸 - 提高到1024x1024
-    size = (1024, 1024)
+    # 绘制尺寸为512x512，只在保存高分辨率PNG时放大到1024x1024，所有绘制和滤镜处理的像素减少为四分之一
+    size = (512, 512)
+    output_size = (1024, 1024)
     
     # 创建空白图像
     image = Image.new('RGBA', size, (255, 255, 255, 0))
+    # 渐变、外发光和阴影都原地粘贴到image上，整个绘制过程共用这一个ImageDraw
     draw = ImageDraw.Draw(image)
     
     # 计算比例
     scale = size[0] / 256  # 相对于原来256x256的缩放比例
     
+    # 按比例缩放后的圆角半径、线宽和模糊半径
+    glow_blur_radius = int(20 * scale)
+    camera_corner_radius = int(30 * scale)
+    viewfinder_corner_radius = int(12 * scale)
+    envelope_corner_radius = int(20 * scale)
+    fold_line_width = int(3 * scale)
+    shadow_blur_radius = int(10 * scale)
+    
     # 绘制背景渐变圆形
     center = (size[0] // 2, size[1] // 2)
     radius = int(size[0] * 0.43)  # 设置半径为画布大小的43%
     
-    # 创建渐变背景
-    for r in range(radius, 0, -1):
-        # 从蓝色渐变到深蓝色
-        ratio = r / radius
-        color = (
-            int(0 + (0 - 0) * (1 - ratio)),          # R
-            int(120 + (80 - 120) * (1 - ratio)),     # G
-            int(212 + (180 - 212) * (1 - ratio)),    # B
-            255                                      # A
-        )
-        circle_bbox = (
-            center[0] - r,
-            center[1] - r,
-            center[0] + r,
-            center[1] + r
-        )
-        draw.ellipse(circle_bbox, fill=color)
+    # 创建渐变背景，从中心的深蓝色渐变到边缘的蓝色
+    paste_radial_gradient(image, center, radius, (0, 80, 180), (0, 120, 212))
     
     # 添加外发光效果
-    glow_image = Image.new('RGBA', size, (255, 255, 255, 0))
-    glow_draw = ImageDraw.Draw(glow_image)
-    
     glow_radius = int(radius * 1.1)
     glow_bbox = (
         center[0] - glow_radius,
@@ -56,13 +257,8 @@ def create_icon():
         center[0] + glow_radius,
         center[1] + glow_radius
     )
-    glow_draw.ellipse(glow_bbox, fill=(0, 120, 212, 40))
-    
-    # 应用模糊效果
-    glow_image = glow_image.filter(ImageFilter.GaussianBlur(radius=int(20 * scale)))
-    
-    # 合并图层
-    image = Image.alpha_composite(glow_image, image)
+    composite_blurred_under(image, 'ellipse', glow_bbox, glow_blur_radius, (255, 255, 255, 0),
+                            fill=(0, 120, 212, 40))
     
     # 绘制相机图标 - 更精细的设计
     
@@ -82,8 +278,7 @@ def create_icon():
         camera_right,
         camera_bottom
     )
-    draw = ImageDraw.Draw(image)
-    draw.rounded_rectangle(camera_body_dark_bbox, radius=int(30 * scale), fill=camera_body_dark)
+    draw.rounded_rectangle(camera_body_dark_bbox, radius=camera_corner_radius, fill=camera_body_dark)
     
     # 相机主体亮色 - 顶部
     camera_body_light = (60, 60, 65)
@@ -94,7 +289,7 @@ def create_icon():
         camera_right,
         camera_top + camera_top_section_height
     )
-    draw.rounded_rectangle(camera_body_light_bbox, radius=int(30 * scale), fill=camera_body_light)
+    draw.rounded_rectangle(camera_body_light_bbox, radius=camera_corner_radius, fill=camera_body_light)
     
     # 相机突出部分（顶部凸起）
     viewfinder_width = int(160 * scale)
@@ -111,7 +306,7 @@ def create_icon():
         viewfinder_right,
         viewfinder_bottom
     )
-    draw.rounded_rectangle(viewfinder_bbox, radius=int(12 * scale), fill=camera_body_dark)
+    draw.rounded_rectangle(viewfinder_bbox, radius=viewfinder_corner_radius, fill=camera_body_dark)
     
     # 相机镜头
     lens_center_x = size[0] // 2
@@ -157,17 +352,7 @@ def create_icon():
     )
     
     # 创建镜头渐变效果
-    for r in range(lens_glass_radius, 0, -1):
-        ratio = r / lens_glass_radius
-        blue_value = int(130 + (230 - 130) * (1 - ratio))
-        color = (0, 80, blue_value, 255)
-        glass_bbox = (
-            lens_center_x - r,
-            lens_center_y - r,
-            lens_center_x + r,
-            lens_center_y + r
-        )
-        draw.ellipse(glass_bbox, fill=color)
+    paste_radial_gradient(image, (lens_center_x, lens_center_y), lens_glass_radius, (0, 80, 230), (0, 80, 130))
     
     # 添加闪光灯
     flash_size = int(40 * scale)
@@ -206,92 +391,71 @@ def create_icon():
     draw.rounded_rectangle(
         (envelope_left, envelope_top,
          envelope_left + envelope_width, envelope_top + envelope_height),
-        radius=int(20 * scale),
+        radius=envelope_corner_radius,
         fill=envelope_color
     )
     
     # 邮件信封上的折叠线
     fold_color = (200, 200, 200)
-    # 中间折线
+    # 中间折线和两条斜折线交于信封中心，作为一条折线一次绘制：
+    # 左边缘到中心，往返左上角，往返右上角，再到右边缘
+    fold_mid_y = envelope_top + envelope_height // 2
+    fold_center = (envelope_left + envelope_width // 2, fold_mid_y)
     draw.line(
-        (envelope_left, envelope_top + envelope_height // 2,
-         envelope_left + envelope_width, envelope_top + envelope_height // 2),
+        [(envelope_left, fold_mid_y), fold_center,
+         (envelope_left, envelope_top), fold_center,
+         (envelope_left + envelope_width, envelope_top), fold_center,
+         (envelope_left + envelope_width, fold_mid_y)],
         fill=fold_color,
-        width=int(3 * scale)
+        width=fold_line_width
     )
     
-    # 斜折线 - 左上到中间
-    draw.line(
-        (envelope_left, envelope_top,
-         envelope_left + envelope_width // 2, envelope_top + envelope_height // 2),
-        fill=fold_color,
-        width=int(3 * scale)
-    )
-    
-    # 斜折线 - 右上到中间
-    draw.line(
-        (envelope_left + envelope_width, envelope_top,
-         envelope_left + envelope_width // 2, envelope_top + envelope_height // 2),
-        fill=fold_color,
-        width=int(3 * scale)
-    )
-    
-    # 添加邮件图标的阴影
+    # 添加邮件图标的阴影，合成在原图下方
     shadow_offset = int(8 * scale)
-    envelope_shadow = Image.new('RGBA', size, (0, 0, 0, 0))
-    shadow_draw = ImageDraw.Draw(envelope_shadow)
-    shadow_draw.rounded_rectangle(
+    composite_blurred_under(
+        image, 'rectangle',
         (envelope_left + shadow_offset, envelope_top + shadow_offset,
          envelope_left + envelope_width + shadow_offset, envelope_top + envelope_height + shadow_offset),
-        radius=int(20 * scale),
+        shadow_blur_radius, (0, 0, 0, 0),
         fill=(0, 0, 0, 80)
     )
-    envelope_shadow = envelope_shadow.filter(ImageFilter.GaussianBlur(radius=int(10 * scale)))
-    
-    # 合并阴影与原图
-    image = Image.alpha_composite(envelope_shadow, image)
     
     # 轻微的整体增强
-    enhancer = ImageEnhance.Contrast(image)
-    image = enhancer.enhance(1.05)
-    
-    enhancer = ImageEnhance.Brightness(image)
-    image = enhancer.enhance(1.02)
+    image = enhance_contrast_brightness(image, 1.05, 1.02)
     
     # 保存为高分辨率PNG和ICO文件
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    tools_dir = os.path.dirname(current_dir)
-    assets_dir = os.path.join(tools_dir, "assets")
-    
     # 确保assets目录存在
     if not os.path.exists(assets_dir):
         os.makedirs(assets_dir, exist_ok=True)
     
-    # 更新文件保存路径
-    png_path = os.path.join(assets_dir, "icon_1024.png")
-    icon_path = os.path.join(assets_dir, "icon.ico")
+    # PNG与ICO互不依赖，PNG的放大和编码在后台线程进行，与ICO的生成同时执行
+    # Pillow的缩放和编码在C代码中执行时会释放GIL，两者可以真正并行
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        png_future = executor.submit(
+            lambda: _write_atomic(png_path, encode_png(image.resize(output_size, Image.Resampling.LANCZOS))))
+        
+        # 创建不同尺寸的图标版本，ICO格式最大只支持256x256
+        # 各尺寸都是2的幂，由上一级逐级减半得到，reduce按2x2像素块取平均，比LANCZOS卷积开销小得多
+        icon_sizes = [256, 128, 64, 32, 16]
+        icons = []
+        source = image
+        for s in icon_sizes:
+            source = source.reduce(source.width // s)
+            icons.append(source)
+        
+        # 保存为ICO文件，包含多个尺寸
+        _write_atomic(icon_path, build_ico(icons))
+        
+        # 等待PNG保存完成，保存失败时在此抛出异常
+        png_future.result()
     
-    # 保存PNG
-    image.save(png_path)
     print(f"高分辨率PNG图标已保存: {png_path}")
-    
-    # 创建不同尺寸的图标版本
-    icon_sizes = [1024, 512, 256, 128, 64, 32, 16]
-    icons = []
-    
-    for s in icon_sizes:
-        if s == 1024:
-            icons.append(image)
-        else:
-            icons.append(image.resize((s, s), Image.Resampling.LANCZOS))
-    
-    # 保存为ICO文件，包含多个尺寸
-    icons[0].save(icon_path, format='ICO', 
-                 sizes=[(s, s) for s in icon_sizes],
-                 append_images=icons[1:])
-    
     print(f"ICO图标文件已保存: {icon_path}")
+    
+    # 两个文件都保存成功后才记录摘要
+    with open(hash_path, 'w', encoding='ascii') as f:
+        f.write(source_digest)
     return icon_path
 
 if __name__ == "__main__":
-    create_icon()
\ No newline at end of file
+    create_icon(force='--force' in sys.argv)
\ No newline at end of file